@@ -70,6 +70,10 @@ class BettingBot(commands.Bot):
     
     async def on_command_error(self, ctx, error):
         """Global error handler"""
+        # Cog-level handlers mark errors they have already reported
+        if getattr(ctx, 'error_handled', False):
+            return
+        
         if isinstance(error, commands.CommandNotFound):
             await ctx.send("❌ Command not found. Use `!help` to see available commands.")
         elif isinstance(error, commands.MissingRequiredArgument):
@@ -213,6 +217,14 @@ async def help_command(ctx):
     await ctx.send(embed=embed)
 
 if __name__ == "__main__":
+    # uvloop hands aiosqlite's thread results back to the loop much faster than
+    # the default selector loop; it isn't available on Windows
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        logger.info("uvloop not installed, using the default asyncio event loop")
+    
     try:
         bot.run(Config.DISCORD_TOKEN)
     except discord.LoginFailure:
@@ -15,7 +15,7 @@ class Activity(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.activity_manager = ActivityManager(db_manager)
+        self.activity_manager = ActivityManager(db_manager, user_manager)
         self.message_cache = {}  # In-memory cooldown tracking for performance
         
         # Start background task
@@ -61,12 +61,12 @@ class Activity(commands.Cog):
         # Get guild-specific settings
         settings = await self.activity_manager.get_activity_settings(guild_id)
         
-        # Check if channel or user roles are excluded
-        if channel_id in settings.get('excluded_channels', []):
+        # Check if channel or user roles are excluded (both are frozensets)
+        if channel_id in settings['excluded_channels']:
             return
         
-        user_role_ids = [role.id for role in message.author.roles]
-        if any(role_id in settings.get('excluded_roles', []) for role_id in user_role_ids):
+        excluded_roles = settings['excluded_roles']
+        if excluded_roles and not excluded_roles.isdisjoint(role.id for role in message.author.roles):
             return
         
         # Track the message
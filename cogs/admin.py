@@ -1,6 +1,6 @@
 import discord
 from discord.ext import commands
-from database.database import user_manager
+from database.database import db_manager, user_manager
 from cogs.betting import bet_manager
 import logging
 
@@ -135,22 +135,18 @@ class Admin(commands.Cog):
             await ctx.send("❌ Balance cannot be negative!")
             return
         
-        # Get or create user
-        db_user, is_new = await user_manager.get_or_create_user(user.id, user.display_name)
-        old_balance = db_user.balance
-        
-        # Update balance
-        success = await user_manager.update_balance(user.id, amount)
-        
-        if success:
-            # Log the transaction
-            difference = amount - old_balance
-            await user_manager.add_transaction(
-                user.id, difference, 'admin_adjustment',
-                description=f"Balance set by admin {ctx.author.display_name}",
-                balance_before=old_balance, balance_after=amount
-            )
+        # Registration and the adjustment share one commit
+        async with db_manager.transaction():
+            # Get or create user
+            await user_manager.get_or_create_user(user.id, user.display_name)
             
+            # Update balance and log the adjustment
+            old_balance = await user_manager.set_balance(
+                user.id, amount, 'admin_adjustment',
+                description=f"Balance set by admin {ctx.author.display_name}"
+            )
+        
+        if old_balance is not None:
             embed = discord.Embed(
                 title="✅ Balance Updated",
                 color=discord.Color.green()
@@ -173,14 +169,16 @@ class Admin(commands.Cog):
             await ctx.send("❌ Amount must be positive!")
             return
         
-        # Get or create user
-        db_user, is_new = await user_manager.get_or_create_user(user.id, user.display_name)
-        
-        # Add points
-        success = await user_manager.add_points(
-            user.id, amount, 'admin_adjustment',
-            description=f"Points added by admin {ctx.author.display_name}"
-        )
+        # Registration and the adjustment share one commit
+        async with db_manager.transaction():
+            # Get or create user
+            db_user, is_new = await user_manager.get_or_create_user(user.id, user.display_name)
+            
+            # Add points
+            success = await user_manager.add_points(
+                user.id, amount, 'admin_adjustment',
+                description=f"Points added by admin {ctx.author.display_name}"
+            )
         
         if success:
             # Get updated balance
@@ -259,7 +257,6 @@ class Admin(commands.Cog):
         # Basic info
         embed.add_field(name="Discord ID", value=str(user.id), inline=True)
         embed.add_field(name="Balance", value=f"{db_user.balance:,} points", inline=True)
-        embed.add_field(name="Status", value="🟢 Active" if db_user.is_registered else "🔴 Inactive", inline=True)
         
         # Betting stats
         stats = db_user.to_dict()
@@ -130,12 +130,11 @@ class BetListAdminView(discord.ui.View):
         
         try:
             # Update bet status to locked
-            conn = await db_manager.get_connection()
-            cursor = await conn.execute(
-                "UPDATE bets SET status = 'locked' WHERE bet_id = ? AND status = 'open'",
-                (self.bet_id,)
-            )
-            await conn.commit()
+            async with db_manager.transaction() as conn:
+                cursor = await conn.execute(
+                    "UPDATE bets SET status = 'locked' WHERE bet_id = ? AND status = 'open'",
+                    (self.bet_id,)
+                )
             
             if cursor.rowcount == 0:
                 await interaction.response.send_message("❌ Bet is not in open status or doesn't exist.", ephemeral=True)
@@ -151,7 +150,6 @@ class BetListAdminView(discord.ui.View):
             
             # Update active channel with locked status
             try:
-                from cogs.channels import Channels
                 channels_cog = interaction.client.get_cog('Channels')
                 if channels_cog:
                     bet = await bet_manager.get_bet(self.bet_id)
@@ -253,12 +251,11 @@ class BetResolutionView(discord.ui.View):
         
         try:
             # Update bet status to locked
-            conn = await db_manager.get_connection()
-            await conn.execute(
-                "UPDATE bets SET status = 'locked' WHERE bet_id = ? AND status = 'open'",
-                (self.bet_id,)
-            )
-            await conn.commit()
+            async with db_manager.transaction() as conn:
+                await conn.execute(
+                    "UPDATE bets SET status = 'locked' WHERE bet_id = ? AND status = 'open'",
+                    (self.bet_id,)
+                )
             
             embed = discord.Embed(
                 title="🔒 Bet Locked",
@@ -270,7 +267,6 @@ class BetResolutionView(discord.ui.View):
             
             # Update active channel with locked status
             try:
-                from cogs.channels import Channels
                 channels_cog = interaction.client.get_cog('Channels')
                 if channels_cog:
                     bet = await bet_manager.get_bet(self.bet_id)
@@ -405,45 +401,48 @@ class BetCancelConfirmModal(discord.ui.Modal):
             return
         
         try:
-            # Get bet details and all user bets
+            # Get bet details
             bet = await bet_manager.get_bet(self.bet_id)
             if not bet or bet['status'] not in ['open', 'locked']:
                 await interaction.response.send_message("❌ Bet cannot be cancelled at this time.", ephemeral=True)
                 return
             
-            user_bets = await bet_manager.get_user_bets_for_bet(self.bet_id)
-            
-            # Refund all players
-            total_refunded = 0
-            refund_count = 0
-            
-            conn = await db_manager.get_connection()
+            refund_reason = f"Bet cancelled - {self.reason_input.value.strip()[:50]}"
+            now = datetime.now(timezone.utc).isoformat()
             
-            for user_bet in user_bets:
-                if user_bet['status'] == 'pending':
-                    # Refund the user
-                    await user_manager.add_points(
-                        user_bet['user_id'], user_bet['amount'], 'bet_refunded',
-                        self.bet_id, f"Bet cancelled - {self.reason_input.value.strip()[:50]}"
-                    )
+            # Status change, refunds and user bet updates commit together; the
+            # status guard stops a concurrent resolve or cancel from paying twice
+            async with db_manager.transaction() as conn:
+                cursor = await conn.execute(
+                    "UPDATE bets SET status = 'cancelled', resolved_at = ? "
+                    "WHERE bet_id = ? AND status IN ('open', 'locked')",
+                    (now, self.bet_id)
+                )
+                cancelled = cursor.rowcount > 0
+                
+                if cancelled:
+                    user_bets = await bet_manager.get_user_bets_for_bet(self.bet_id)
+                    pending = [user_bet for user_bet in user_bets if user_bet['status'] == 'pending']
+                    
+                    # Refund the users
+                    await user_manager.add_points_many([
+                        (user_bet['user_id'], user_bet['amount'], 'bet_refunded', self.bet_id, refund_reason)
+                        for user_bet in pending
+                    ], now=now)
                     
                     # Update user bet status
-                    await conn.execute(
+                    await conn.executemany(
                         "UPDATE user_bets SET status = 'refunded' WHERE id = ?",
-                        (user_bet['id'],)
+                        [(user_bet['id'],) for user_bet in pending]
                     )
-                    
-                    total_refunded += user_bet['amount']
-                    refund_count += 1
             
-            # Update bet status
-            now = datetime.now(timezone.utc).isoformat()
-            await conn.execute(
-                "UPDATE bets SET status = 'cancelled', resolved_at = ? WHERE bet_id = ?",
-                (now, self.bet_id)
-            )
+            if not cancelled:
+                await interaction.response.send_message("❌ Bet cannot be cancelled at this time.", ephemeral=True)
+                return
             
-            await conn.commit()
+            # Summarize the refunds
+            total_refunded = sum(user_bet['amount'] for user_bet in pending)
+            refund_count = len(pending)
             
             # Create response embed
             embed = discord.Embed(
@@ -466,7 +465,6 @@ class BetCancelConfirmModal(discord.ui.Modal):
             
             # Update active channel with cancelled status
             try:
-                from cogs.channels import Channels
                 channels_cog = interaction.client.get_cog('Channels')
                 if channels_cog:
                     await channels_cog.update_active_bet_status(bet, 'cancelled')
@@ -550,7 +548,8 @@ class BetCreationModal(discord.ui.Modal):
             description = self.description_input.value.strip() or None
             
             bet_id = await bet_manager.create_bet(
-                interaction.user.id, bet_type, title, options, description, interaction.guild.id
+                interaction.user.id, bet_type, title, options, description, interaction.guild.id,
+                creator_display_name=interaction.user.display_name
             )
             
             # Create success embed
@@ -652,7 +651,8 @@ class QuickYesNoModal(discord.ui.Modal):
             options = ["Yes", "No"]
             
             bet_id = await bet_manager.create_bet(
-                interaction.user.id, 'yn', title, options, description, interaction.guild.id
+                interaction.user.id, 'yn', title, options, description, interaction.guild.id,
+                creator_display_name=interaction.user.display_name
             )
             
             # Create success embed
@@ -1019,31 +1019,31 @@ class BetManager:
         self.db = db_manager
         self.bot = bot
     
-    async def create_bet(self, creator_id: int, bet_type: str, title: str, options: list, description: str = None, guild_id: int = None) -> int:
+    async def create_bet(self, creator_id: int, bet_type: str, title: str, options: list, description: str = None, guild_id: int = None,
+                         creator_display_name: str = None) -> int:
         """Create a new bet and return bet_id"""
         now = datetime.now(timezone.utc).isoformat()
         options_json = json.dumps(options)
         
-        conn = await self.db.get_connection()
-        cursor = await conn.execute("""
-            INSERT INTO bets (
-                creator_id, guild_id, bet_type, title, description, options, 
-                status, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, 'open', ?)
-        """, (creator_id, guild_id, bet_type, title, description, options_json, now))
-        
-        bet_id = cursor.lastrowid
-        await conn.commit()
+        async with self.db.transaction() as conn:
+            cursor = await conn.execute("""
+                INSERT INTO bets (
+                    creator_id, guild_id, bet_type, title, description, options, 
+                    status, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, 'open', ?)
+            """, (creator_id, guild_id, bet_type, title, description, options_json, now))
+            
+            bet_id = cursor.lastrowid
         
         # Post to active bets channel if configured
         if guild_id:
             try:
-                from cogs.channels import Channels
                 channels_cog = self.bot.get_cog('Channels') if hasattr(self, 'bot') else None
                 if channels_cog:
                     bet_data = {
                         'bet_id': bet_id,
                         'creator_id': creator_id,
+                        'creator_display_name': creator_display_name,
                         'bet_type': bet_type,
                         'title': title,
                         'description': description,
@@ -1104,39 +1104,36 @@ class BetManager:
         if option.lower() not in [opt.lower() for opt in bet['options']]:
             return False
         
-        # Check if user has already bet on this
-        conn = await self.db.get_connection()
-        cursor = await conn.execute(
-            "SELECT id FROM user_bets WHERE user_id = ? AND bet_id = ?",
-            (user_id, bet_id)
-        )
-        if await cursor.fetchone():
-            return False  # Already bet on this
-        
-        # Check user balance and deduct points
-        success = await user_manager.deduct_points(
-            user_id, amount, 'bet_placed', bet_id, 
-            f"Bet placed on '{bet['title']}' - {option}"
-        )
-        
-        if not success:
-            return False
-        
-        # Record the bet
+        # One timestamp for the deduction and the bet record
         now = datetime.now(timezone.utc).isoformat()
-        await conn.execute("""
-            INSERT INTO user_bets (
-                user_id, bet_id, option_chosen, amount, created_at
-            ) VALUES (?, ?, ?, ?, ?)
-        """, (user_id, bet_id, option, amount, now))
-        
-        # Update bet total pool
-        await conn.execute(
-            "UPDATE bets SET total_pool = total_pool + ? WHERE bet_id = ?",
-            (amount, bet_id)
-        )
         
-        await conn.commit()
+        # The duplicate check, deduction and bet record commit together
+        async with self.db.transaction() as conn:
+            # Check if user has already bet on this
+            cursor = await conn.execute(
+                "SELECT id FROM user_bets WHERE user_id = ? AND bet_id = ?",
+                (user_id, bet_id)
+            )
+            if await cursor.fetchone():
+                return False  # Already bet on this
+            
+            # Check user balance and deduct points
+            success = await user_manager.deduct_points(
+                user_id, amount, 'bet_placed', bet_id, 
+                f"Bet placed on '{bet['title']}' - {option}", now=now
+            )
+            
+            if not success:
+                return False
+            
+            # Record the bet (a trigger adds it to bets.total_pool)
+            await conn.execute("""
+                INSERT INTO user_bets (
+                    user_id, bet_id, option_chosen, amount, created_at
+                ) VALUES (?, ?, ?, ?, ?)
+            """, (user_id, bet_id, option, amount, now))
+        
+        user_manager.mark_stats_dirty(user_id)
         return True
     
     async def get_user_bets_for_bet(self, bet_id: int):
@@ -1162,88 +1159,100 @@ class BetManager:
         if winning_option.lower() not in [opt.lower() for opt in bet['options']]:
             return {'success': False, 'error': 'Invalid winning option'}
         
-        conn = await self.db.get_connection()
-        
-        # Get all bets for this bet_id
-        user_bets = await self.get_user_bets_for_bet(bet_id)
-        
-        # Calculate winners and losers
-        winners = []
-        losers = []
-        total_winning_amount = 0
-        total_losing_amount = 0
+        now = datetime.now(timezone.utc).isoformat()
         
-        for user_bet in user_bets:
-            if user_bet['option_chosen'].lower() == winning_option.lower():
-                winners.append(user_bet)
-                total_winning_amount += user_bet['amount']
-            else:
-                losers.append(user_bet)
-                total_losing_amount += user_bet['amount']
-        
-        # Calculate payouts (simple proportional distribution)
-        payout_results = []
-        
-        if winners and total_losing_amount > 0:
-            # Winners split the pot proportionally
-            for winner in winners:
-                # Winner gets their bet back + proportional share of losers' money
-                proportion = winner['amount'] / total_winning_amount
-                winnings = winner['amount'] + int(total_losing_amount * proportion)
+        # Payouts and every status update commit together; claiming the bet first
+        # stops a concurrent resolve or cancel from paying it out twice
+        async with self.db.transaction() as conn:
+            # Update bet status
+            cursor = await conn.execute(
+                "UPDATE bets SET status = 'resolved', winning_option = ?, resolved_at = ? "
+                "WHERE bet_id = ? AND status = 'open'",
+                (winning_option, now, bet_id)
+            )
+            if cursor.rowcount == 0:
+                return {'success': False, 'error': 'Bet not found or already resolved'}
+            
+            # Get all bets for this bet_id
+            user_bets = await self.get_user_bets_for_bet(bet_id)
+            
+            # Calculate winners and losers
+            winners = []
+            losers = []
+            total_winning_amount = 0
+            total_losing_amount = 0
+            
+            for user_bet in user_bets:
+                if user_bet['option_chosen'].lower() == winning_option.lower():
+                    winners.append(user_bet)
+                    total_winning_amount += user_bet['amount']
+                else:
+                    losers.append(user_bet)
+                    total_losing_amount += user_bet['amount']
+            
+            # Calculate payouts (simple proportional distribution)
+            payout_results = []
+            payouts = []
+            
+            if winners and total_losing_amount > 0:
+                # Winners split the pot proportionally
+                won_updates = []
+                for winner in winners:
+                    # Winner gets their bet back + proportional share of losers' money
+                    proportion = winner['amount'] / total_winning_amount
+                    winnings = winner['amount'] + int(total_losing_amount * proportion)
+                    
+                    payouts.append((
+                        winner['user_id'], winnings, 'bet_won', bet_id,
+                        f"Won bet '{bet['title']}' - {winning_option}"
+                    ))
+                    won_updates.append((winnings, winner['id']))
+                    
+                    payout_results.append({
+                        'user_id': winner['user_id'],
+                        'username': winner['username'],
+                        'bet_amount': winner['amount'],
+                        'winnings': winnings,
+                        'profit': winnings - winner['amount']
+                    })
                 
-                # Add winnings to user balance
-                await user_manager.add_points(
-                    winner['user_id'], winnings, 'bet_won', bet_id,
-                    f"Won bet '{bet['title']}' - {winning_option}"
-                )
+                # Add winnings to user balances
+                await user_manager.add_points_many(payouts, now=now)
                 
                 # Update user bet status
-                await conn.execute(
+                await conn.executemany(
                     "UPDATE user_bets SET status = 'won', potential_payout = ? WHERE id = ?",
-                    (winnings, winner['id'])
+                    won_updates
                 )
+            
+            elif winners and total_losing_amount == 0:
+                # No losers, refund everyone
+                for winner in winners:
+                    payouts.append((
+                        winner['user_id'], winner['amount'], 'bet_refunded', bet_id,
+                        f"Bet refunded '{bet['title']}' - no opposing bets"
+                    ))
                 
-                payout_results.append({
-                    'user_id': winner['user_id'],
-                    'username': winner['username'],
-                    'bet_amount': winner['amount'],
-                    'winnings': winnings,
-                    'profit': winnings - winner['amount']
-                })
-        
-        elif winners and total_losing_amount == 0:
-            # No losers, refund everyone
-            for winner in winners:
-                await user_manager.add_points(
-                    winner['user_id'], winner['amount'], 'bet_refunded', bet_id,
-                    f"Bet refunded '{bet['title']}' - no opposing bets"
-                )
+                await user_manager.add_points_many(payouts, now=now)
                 
-                await conn.execute(
+                await conn.executemany(
                     "UPDATE user_bets SET status = 'refunded', potential_payout = ? WHERE id = ?",
-                    (winner['amount'], winner['id'])
+                    [(winner['amount'], winner['id']) for winner in winners]
                 )
-        
-        # Mark losing bets
-        for loser in losers:
-            await conn.execute(
+            
+            # Mark losing bets
+            await conn.executemany(
                 "UPDATE user_bets SET status = 'lost' WHERE id = ?",
-                (loser['id'],)
+                [(loser['id'],) for loser in losers]
             )
         
-        # Update bet status
-        now = datetime.now(timezone.utc).isoformat()
-        await conn.execute(
-            "UPDATE bets SET status = 'resolved', winning_option = ?, resolved_at = ? WHERE bet_id = ?",
-            (winning_option, now, bet_id)
-        )
-        
-        await conn.commit()
+        # Winners' won counts changed after their payout transactions were logged
+        for winner in winners:
+            user_manager.mark_stats_dirty(winner['user_id'])
         
         # Post to history channel and update active channel if configured
         if self.bot:
             try:
-                from cogs.channels import Channels
                 channels_cog = self.bot.get_cog('Channels')
                 if channels_cog:
                     # Post to history channel
@@ -1349,7 +1358,8 @@ class Betting(commands.Cog):
             # Create yes/no bet
             options = ["Yes", "No"]
             bet_id = await bet_manager.create_bet(
-                ctx.author.id, 'yn', question, options, None, ctx.guild.id
+                ctx.author.id, 'yn', question, options, None, ctx.guild.id,
+                creator_display_name=ctx.author.display_name
             )
             
             embed = discord.Embed(
@@ -1,14 +1,75 @@
 import discord
 from discord.ext import commands
+import json
 import logging
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from time import time
+from typing import Optional, Dict, Any, List, Tuple
 
 from database.database import db_manager
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Hot-path SQL kept as constants so the statement cache hits on every call
+_SQL_SELECT_SETTINGS = "SELECT bet_history_channel, active_bets_channel FROM settings WHERE guild_id = ?"
+_SQL_UPSERT_SETTINGS = """
+    INSERT INTO settings (guild_id, bet_history_channel, active_bets_channel, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(guild_id) DO UPDATE SET
+        bet_history_channel = COALESCE(excluded.bet_history_channel, bet_history_channel),
+        active_bets_channel = COALESCE(excluded.active_bets_channel, active_bets_channel),
+        updated_at = excluded.updated_at
+"""
+_SQL_UPDATE_ACTIVE_MSG = "UPDATE bets SET active_message_id = ? WHERE bet_id = ?"
+
+# Max number of active-bet messages kept to skip fetch_message round-trips
+_ACTIVE_MESSAGE_CACHE_SIZE = 512
+
+# Cached (bet_history_channel, active_bets_channel) for guilds with nothing configured
+_NO_CHANNELS: Tuple[Optional[int], Optional[int]] = (None, None)
+
+# Statuses that produce an active channel update
+_BROADCAST_STATUSES = frozenset(('locked', 'cancelled', 'resolved'))
+
+# Title format, color and creator footer for every embed posted to the bet channels
+_EMBED_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    'created': {'title': "🎲 New Bet Created - #{bet_id}", 'color': discord.Color.blue(), 'footer': True},
+    'history': {'title': "🏆 Bet Resolved - #{bet_id}", 'color': discord.Color.green(), 'footer': True},
+    'resolved': {'title': "🏆 Bet #{bet_id} - Resolved", 'color': discord.Color.green(), 'footer': False},
+    'locked': {'title': "🔒 Bet #{bet_id} - Locked", 'color': discord.Color.orange(), 'footer': False},
+    'cancelled': {'title': "❌ Bet #{bet_id} - Cancelled", 'color': discord.Color.red(), 'footer': False},
+}
+
+# Static status fields for active channel updates (resolved depends on the winner)
+_LOCKED_FIELD = (
+    "🔒 Bet Locked",
+    "This bet is now locked - no more bets can be placed.\n"
+    "⏳ Waiting for admin to resolve the bet.\n"
+    "📊 Final results coming soon!",
+    False
+)
+_CANCELLED_FIELD = (
+    "❌ Bet Cancelled",
+    "This bet has been cancelled by an admin.\n"
+    "💰 All participants have been refunded their bet amounts.\n"
+    "📜 This action has been logged.",
+    False
+)
+
+def _clip(s: str, n: int = 1000) -> str:
+    """Trim s to n characters, returning it unchanged (no copy) when already short"""
+    return s if len(s) <= n else s[:n]
+
+def _creator_display_name(guild: discord.Guild, bet_data: Dict[str, Any]) -> Optional[str]:
+    """Creator name captured at bet creation, falling back to the member cache"""
+    name = bet_data.get('creator_display_name')
+    if name:
+        return name
+    creator = guild.get_member(bet_data['creator_id'])
+    return creator.display_name if creator else None
+
 # Admin View for Active Bets
 class ActiveBetAdminView(discord.ui.View):
     """View with admin controls for active bets"""
@@ -85,12 +146,11 @@ class ActiveBetAdminView(discord.ui.View):
             return
         
         try:
-            conn = await db_manager.get_connection()
-            cursor = await conn.execute(
-                "UPDATE bets SET status = 'locked' WHERE bet_id = ? AND status = 'open'",
-                (self.bet_id,)
-            )
-            await conn.commit()
+            async with db_manager.transaction() as conn:
+                cursor = await conn.execute(
+                    "UPDATE bets SET status = 'locked' WHERE bet_id = ? AND status = 'open'",
+                    (self.bet_id,)
+                )
             
             if cursor.rowcount > 0:
                 # Update the embed to show locked status
@@ -150,7 +210,6 @@ class ActiveBetAdminView(discord.ui.View):
         row = await cursor.fetchone()
         
         if row:
-            import json
             bet = dict(row)
             bet['options'] = json.loads(bet['options'])
             if bet.get('odds'):
@@ -163,147 +222,134 @@ class Channels(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
+        self._active_messages: OrderedDict[int, discord.Message] = OrderedDict()
+        self._channel_cache: Dict[int, Tuple[Optional[int], Optional[int]]] = {}
     
-    async def get_guild_settings(self, guild_id: int) -> Dict[str, Any]:
-        """Get guild settings including channel configurations"""
-        conn = await db_manager.get_connection()
+    def _remember_active_message(self, bet_id: int, message: discord.Message) -> None:
+        """Cache the posted active-bet message (LRU, bounded)"""
+        self._active_messages[bet_id] = message
+        self._active_messages.move_to_end(bet_id)
+        if len(self._active_messages) > _ACTIVE_MESSAGE_CACHE_SIZE:
+            self._active_messages.popitem(last=False)
+    
+    async def _get_channel_ids(self, guild_id: int) -> Tuple[Optional[int], Optional[int]]:
+        """Get (history, active) channel IDs, served from cache after the first lookup"""
+        channels = self._channel_cache.get(guild_id)
+        if channels is not None:
+            return channels
         
-        cursor = await conn.execute(
-            "SELECT bet_history_channel, active_bets_channel FROM settings WHERE guild_id = ?",
-            (guild_id,)
-        )
+        conn = await db_manager.get_connection()
+        cursor = await conn.execute(_SQL_SELECT_SETTINGS, (guild_id,))
         row = await cursor.fetchone()
         
-        if row:
-            return {
-                'bet_history_channel': row[0],
-                'active_bets_channel': row[1]
-            }
-        else:
-            return {
-                'bet_history_channel': None,
-                'active_bets_channel': None
-            }
+        channels = (row[0], row[1]) if row and (row[0] or row[1]) else _NO_CHANNELS
+        self._channel_cache[guild_id] = channels
+        return channels
+    
+    async def get_history_channel_id(self, guild_id: int) -> Optional[int]:
+        """Get the configured bet history channel ID, if any"""
+        return (await self._get_channel_ids(guild_id))[0]
+    
+    async def get_active_channel_id(self, guild_id: int) -> Optional[int]:
+        """Get the configured active bets channel ID, if any"""
+        return (await self._get_channel_ids(guild_id))[1]
+    
+    async def get_guild_settings(self, guild_id: int) -> Dict[str, Any]:
+        """Get guild settings including channel configurations"""
+        history_channel, active_channel = await self._get_channel_ids(guild_id)
+        return {
+            'bet_history_channel': history_channel,
+            'active_bets_channel': active_channel
+        }
     
     async def update_guild_channels(self, guild_id: int, bet_history_channel: int = None, active_bets_channel: int = None) -> bool:
         """Update guild channel settings"""
-        now = datetime.now(timezone.utc).isoformat()
-        conn = await db_manager.get_connection()
+        now = int(time())  # settings timestamps are stored as Unix epoch seconds
         
         try:
-            # Check if settings exist
-            cursor = await conn.execute("SELECT guild_id FROM settings WHERE guild_id = ?", (guild_id,))
-            exists = await cursor.fetchone()
-            
-            if exists:
-                # Update existing settings
-                updates = []
-                params = []
-                
-                if bet_history_channel is not None:
-                    updates.append("bet_history_channel = ?")
-                    params.append(bet_history_channel)
-                
-                if active_bets_channel is not None:
-                    updates.append("active_bets_channel = ?")
-                    params.append(active_bets_channel)
-                
-                if updates:
-                    updates.append("updated_at = ?")
-                    params.append(now)
-                    params.append(guild_id)
-                    
-                    query = f"UPDATE settings SET {', '.join(updates)} WHERE guild_id = ?"
-                    await conn.execute(query, params)
-            else:
-                # Create new settings
-                await conn.execute("""
-                    INSERT INTO settings 
-                    (guild_id, bet_history_channel, active_bets_channel, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (guild_id, bet_history_channel, active_bets_channel, now, now))
+            async with db_manager.transaction() as conn:
+                # Single UPSERT; a None channel leaves the stored value untouched
+                await conn.execute(
+                    _SQL_UPSERT_SETTINGS,
+                    (guild_id, bet_history_channel, active_bets_channel, now, now)
+                )
             
-            await conn.commit()
+            self._channel_cache.pop(guild_id, None)
             return True
             
         except Exception as e:
             logger.error(f"Error updating guild channels: {e}")
-            await conn.rollback()
             return False
     
+    def _build_embed(self, bet_data: Dict[str, Any], template: str, fields: List[Tuple[str, str, bool]],
+                     guild: discord.Guild) -> discord.Embed:
+        """Build a bet channel embed from a template and (name, value, inline) fields"""
+        spec = _EMBED_TEMPLATES[template]
+        embed = discord.Embed(
+            title=spec['title'].format(bet_id=bet_data['bet_id']),
+            description=bet_data['title'],
+            color=spec['color']
+        )
+        
+        for name, value, inline in fields:
+            embed.add_field(name=name, value=value, inline=inline)
+        
+        if spec['footer']:
+            creator_name = _creator_display_name(guild, bet_data)
+            if creator_name:
+                embed.set_footer(text=f"Created by {creator_name}")
+        
+        embed.timestamp = datetime.fromtimestamp(time(), tz=timezone.utc)
+        return embed
+    
     async def post_bet_creation(self, bet_data: Dict[str, Any]) -> None:
         """Post bet creation to active bets channel"""
         guild_id = bet_data.get('guild_id')
         if not guild_id:
             return
         
-        settings = await self.get_guild_settings(guild_id)
-        channel_id = settings.get('active_bets_channel')
-        
-        if not channel_id:
-            return
-        
+        # Guilds this client cannot see are skipped before touching the database
         guild = self.bot.get_guild(guild_id)
         if not guild:
             return
         
+        channel_id = await self.get_active_channel_id(guild_id)
+        if not channel_id:
+            return
+        
         channel = guild.get_channel(channel_id)
         if not channel:
             return
         
         try:
-            # Create embed for new bet
-            embed = discord.Embed(
-                title=f"🎲 New Bet Created - #{bet_data['bet_id']}",
-                description=bet_data['title'],
-                color=discord.Color.blue()
-            )
-            
-            if bet_data.get('description'):
-                embed.add_field(
-                    name="Description",
-                    value=bet_data['description'][:1000],
-                    inline=False
-                )
-            
-            # Add options
-            options = bet_data.get('options', [])
+            # Add options (callers pass the decoded list; tolerate raw JSON defensively)
+            options = bet_data.get('options') or []
             if isinstance(options, str):
-                import json
                 options = json.loads(options)
+                bet_data['options'] = options
             
+            fields = []
+            if bet_data.get('description'):
+                fields.append(("Description", _clip(bet_data['description']), False))
             if options:
                 options_text = "\n".join([f"**{i+1}.** {opt}" for i, opt in enumerate(options)])
-                embed.add_field(
-                    name="Options",
-                    value=options_text[:1000],
-                    inline=False
-                )
-            
-            embed.add_field(name="Status", value="🟢 Open", inline=True)
-            embed.add_field(name="Type", value=bet_data.get('bet_type', 'unknown').upper(), inline=True)
-            embed.add_field(name="Min Bet", value=f"{bet_data.get('min_bet', 1)} points", inline=True)
-            
-            creator = guild.get_member(bet_data['creator_id'])
-            if creator:
-                embed.set_footer(text=f"Created by {creator.display_name}")
+                fields.append(("Options", _clip(options_text), False))
+            fields.append(("Status", "🟢 Open", True))
+            fields.append(("Type", bet_data.get('bet_type', 'unknown').upper(), True))
+            fields.append(("Min Bet", f"{bet_data.get('min_bet', 1)} points", True))
             
-            embed.timestamp = datetime.now(timezone.utc)
+            embed = self._build_embed(bet_data, 'created', fields, guild)
             
             # Create admin view with buttons
             admin_view = ActiveBetAdminView(bet_data["bet_id"], bet_data["title"], options)
             
             message = await channel.send(embed=embed, view=admin_view)
+            self._remember_active_message(bet_data['bet_id'], message)
             
             # Store the message ID in the database
             try:
-                from database.database import db_manager
-                conn = await db_manager.get_connection()
-                await conn.execute(
-                    "UPDATE bets SET active_message_id = ? WHERE bet_id = ?",
-                    (message.id, bet_data['bet_id'])
-                )
-                await conn.commit()
+                async with db_manager.transaction() as conn:
+                    await conn.execute(_SQL_UPDATE_ACTIVE_MSG, (message.id, bet_data['bet_id']))
             except Exception as e:
                 logger.error(f"Error storing active message ID: {e}")
             
@@ -316,45 +362,28 @@ class Channels(commands.Cog):
         if not guild_id:
             return
         
-        settings = await self.get_guild_settings(guild_id)
-        channel_id = settings.get('bet_history_channel')
-        
-        if not channel_id:
-            return
-        
         guild = self.bot.get_guild(guild_id)
         if not guild:
             return
         
+        channel_id = await self.get_history_channel_id(guild_id)
+        if not channel_id:
+            return
+        
         channel = guild.get_channel(channel_id)
         if not channel:
             return
         
         try:
-            # Create embed for resolved bet
-            embed = discord.Embed(
-                title=f"🏆 Bet Resolved - #{bet_data['bet_id']}",
-                description=bet_data['title'],
-                color=discord.Color.green()
-            )
-            
+            fields = []
             if bet_data.get('description'):
-                embed.add_field(
-                    name="Description",
-                    value=bet_data['description'][:1000],
-                    inline=False
-                )
+                fields.append(("Description", _clip(bet_data['description']), False))
+            fields.append(("✅ Winning Option", winning_option, False))
+            fields.append(("👥 Participants", str(participants), True))
+            fields.append(("💰 Total Pool", f"{total_pool} points", True))
+            fields.append(("Status", "🔒 Resolved", True))
             
-            embed.add_field(name="✅ Winning Option", value=winning_option, inline=False)
-            embed.add_field(name="👥 Participants", value=str(participants), inline=True)
-            embed.add_field(name="💰 Total Pool", value=f"{total_pool} points", inline=True)
-            embed.add_field(name="Status", value="🔒 Resolved", inline=True)
-            
-            creator = guild.get_member(bet_data['creator_id'])
-            if creator:
-                embed.set_footer(text=f"Created by {creator.display_name}")
-            
-            embed.timestamp = datetime.now(timezone.utc)
+            embed = self._build_embed(bet_data, 'history', fields, guild)
             
             await channel.send(embed=embed)
             
@@ -363,20 +392,22 @@ class Channels(commands.Cog):
     
     async def update_active_bet_status(self, bet_data: Dict[str, Any], new_status: str, winning_option: str = None) -> None:
         """Update bet status in active bets channel"""
-        guild_id = bet_data.get('guild_id')
-        if not guild_id:
+        if new_status not in _BROADCAST_STATUSES:
+            logger.warning(f"No active channel update for bet status '{new_status}'")
             return
         
-        settings = await self.get_guild_settings(guild_id)
-        channel_id = settings.get('active_bets_channel')
-        
-        if not channel_id:
+        guild_id = bet_data.get('guild_id')
+        if not guild_id:
             return
         
         guild = self.bot.get_guild(guild_id)
         if not guild:
             return
         
+        channel_id = await self.get_active_channel_id(guild_id)
+        if not channel_id:
+            return
+        
         channel = guild.get_channel(channel_id)
         if not channel:
             return
@@ -385,7 +416,10 @@ class Channels(commands.Cog):
         active_message_id = bet_data.get('active_message_id')
         if active_message_id and new_status in ['resolved', 'cancelled']:
             try:
-                message = await channel.fetch_message(active_message_id)
+                # Resolve/cancel is terminal, so the cached entry can be dropped
+                message = self._active_messages.pop(bet_data['bet_id'], None)
+                if message is None:
+                    message = await channel.fetch_message(active_message_id)
                 if new_status == 'resolved':
                     # Delete the message for resolved bets
                     await message.delete()
@@ -395,15 +429,18 @@ class Channels(commands.Cog):
                     # Edit the message for cancelled bets
                     embed = message.embeds[0] if message.embeds else None
                     if embed:
-                        embed.color = discord.Color.red()
-                        embed.title = f"❌ CANCELLED - {embed.title}"
-                        embed.clear_fields()
-                        embed.add_field(
+                        # A fresh embed with a single status field is cheaper than clearing the old one
+                        cancelled_embed = discord.Embed(
+                            title=f"❌ CANCELLED - {embed.title}",
+                            description=embed.description,
+                            color=discord.Color.red()
+                        )
+                        cancelled_embed.add_field(
                             name="Status",
                             value="❌ **CANCELLED**\nAll bets have been refunded.",
                             inline=False
                         )
-                        await message.edit(embed=embed)
+                        await message.edit(embed=cancelled_embed)
                         logger.info(f"Updated active bet message for cancelled bet #{bet_data['bet_id']}")
                         return
             except discord.NotFound:
@@ -412,52 +449,23 @@ class Channels(commands.Cog):
                 logger.error(f"Error updating active message: {e}")
         
         try:
-            status_colors = {
-                'locked': discord.Color.orange(),
-                'cancelled': discord.Color.red(),
-                'resolved': discord.Color.green()
-            }
-            
-            status_icons = {
-                'locked': '🔒',
-                'cancelled': '❌',
-                'resolved': '🏆'
-            }
-            
-            embed = discord.Embed(
-                title=f"{status_icons.get(new_status, '📊')} Bet #{bet_data['bet_id']} - {new_status.title()}",
-                description=bet_data['title'],
-                color=status_colors.get(new_status, discord.Color.greyple())
-            )
-            
-            if new_status == 'resolved' and winning_option:
-                embed.add_field(
-                    name="🏆 Final Result", 
-                    value=f"**Winning Option:** {winning_option}\n"
-                          f"✅ This bet has been resolved and moved to bet history.\n"
-                          f"💰 Winnings have been distributed to winners!",
-                    inline=False
-                )
+            if new_status == 'resolved':
+                if winning_option:
+                    field = (
+                        "🏆 Final Result",
+                        f"**Winning Option:** {winning_option}\n"
+                        f"✅ This bet has been resolved and moved to bet history.\n"
+                        f"💰 Winnings have been distributed to winners!",
+                        False
+                    )
+                else:
+                    field = ("Status Update", "Bet is now **RESOLVED**", False)
             elif new_status == 'cancelled':
-                embed.add_field(
-                    name="❌ Bet Cancelled", 
-                    value=f"This bet has been cancelled by an admin.\n"
-                          f"💰 All participants have been refunded their bet amounts.\n"
-                          f"📜 This action has been logged.",
-                    inline=False
-                )
-            elif new_status == 'locked':
-                embed.add_field(
-                    name="🔒 Bet Locked", 
-                    value=f"This bet is now locked - no more bets can be placed.\n"
-                          f"⏳ Waiting for admin to resolve the bet.\n"
-                          f"📊 Final results coming soon!",
-                    inline=False
-                )
+                field = _CANCELLED_FIELD
             else:
-                embed.add_field(name="Status Update", value=f"Bet is now **{new_status.upper()}**", inline=False)
+                field = _LOCKED_FIELD
             
-            embed.timestamp = datetime.now(timezone.utc)
+            embed = self._build_embed(bet_data, new_status, [field], guild)
             
             await channel.send(embed=embed)
             
@@ -465,62 +473,88 @@ class Channels(commands.Cog):
             logger.error(f"Error updating bet status in channel: {e}")
 
 # Admin Commands for Channel Management
+class ChannelsUnavailable(commands.CheckFailure):
+    """Raised when a channel admin command runs without the Channels cog loaded"""
+    pass
+
+
+def _require_channels_cog():
+    """Command check that fails fast when the Channels cog is not loaded"""
+    def predicate(ctx):
+        if ctx.bot.get_cog('Channels') is None:
+            raise ChannelsUnavailable("Channels system not available")
+        return True
+    return commands.check(predicate)
+
+
 class ChannelAdmin(commands.Cog):
     """Admin commands for managing bet channels"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.channels_cog = None
+    
+    @property
+    def channels_cog(self) -> Optional[Channels]:
+        """The loaded Channels cog (subcommands are guarded by _require_channels_cog)"""
+        return self.bot.get_cog('Channels')
     
     async def cog_load(self):
-        """Get reference to channels cog after loading"""
-        self.channels_cog = self.bot.get_cog('Channels')
+        """Build the static admin embeds once; they are sent as copies"""
+        embed = discord.Embed(
+            title="📺 Channel Setup Commands",
+            description="Configure dedicated channels for betting",
+            color=discord.Color.blue()
+        )
+        
+        embed.add_field(
+            name="Setup Commands",
+            value="`!setchannel setup` - **Auto-create both channels** 🚀\n"
+                  "`!setchannel history <#channel>` - Set bet history channel\n"
+                  "`!setchannel active <#channel>` - Set active bets channel\n"
+                  "`!setchannel view` - View current channel settings\n"
+                  "`!setchannel remove <type>` - Remove channel setting",
+            inline=False
+        )
+        
+        embed.add_field(
+            name="Channel Types",
+            value="**History Channel**: Shows all resolved bets\n"
+                  "**Active Channel**: Shows new bets and status updates",
+            inline=False
+        )
+        
+        embed.add_field(
+            name="💡 Quick Start",
+            value="Use `!setchannel setup` to automatically create and configure both channels!\n"
+                  "*Checks for existing channels to avoid duplicates*",
+            inline=False
+        )
+        self._help_embed = embed
+        
+        self._unavailable_embed = discord.Embed(
+            title="❌ Channels System Not Available",
+            description="The channels system is not loaded right now. Please try again later.",
+            color=discord.Color.red()
+        )
+    
+    async def cog_command_error(self, ctx, error):
+        """Report a missing Channels cog once instead of in every subcommand"""
+        if isinstance(error, ChannelsUnavailable):
+            ctx.error_handled = True
+            await ctx.send(embed=self._unavailable_embed.copy())
     
     @commands.group(name='setchannel', aliases=['channel'])
     @commands.has_permissions(administrator=True)
     async def setchannel_group(self, ctx):
         """Set up dedicated bet channels"""
         if ctx.invoked_subcommand is None:
-            embed = discord.Embed(
-                title="📺 Channel Setup Commands",
-                description="Configure dedicated channels for betting",
-                color=discord.Color.blue()
-            )
-            
-            embed.add_field(
-                name="Setup Commands",
-                value="`!setchannel setup` - **Auto-create both channels** 🚀\n"
-                      "`!setchannel history <#channel>` - Set bet history channel\n"
-                      "`!setchannel active <#channel>` - Set active bets channel\n"
-                      "`!setchannel view` - View current channel settings\n"
-                      "`!setchannel remove <type>` - Remove channel setting",
-                inline=False
-            )
-            
-            embed.add_field(
-                name="Channel Types",
-                value="**History Channel**: Shows all resolved bets\n"
-                      "**Active Channel**: Shows new bets and status updates",
-                inline=False
-            )
-            
-            embed.add_field(
-                name="💡 Quick Start",
-                value="Use `!setchannel setup` to automatically create and configure both channels!\n"
-                      "*Checks for existing channels to avoid duplicates*",
-                inline=False
-            )
-            
-            await ctx.send(embed=embed)
+            await ctx.send(embed=self._help_embed.copy())
     
     @setchannel_group.command(name='setup')
     @commands.has_permissions(administrator=True)
+    @_require_channels_cog()
     async def auto_setup_channels(self, ctx):
         """Automatically create and configure bet channels"""
-        if not self.channels_cog:
-            await ctx.send("❌ Channels system not available")
-            return
-        
         # Check if bot has permission to manage channels
         if not ctx.guild.me.guild_permissions.manage_channels:
             embed = discord.Embed(
@@ -580,17 +614,13 @@ class ChannelAdmin(commands.Cog):
                 created_channels.append(f"🎲 {active_channel.mention} (active-bets)")
             
             # Configure the channels
-            success1 = await self.channels_cog.update_guild_channels(
-                ctx.guild.id,
-                bet_history_channel=history_channel.id
-            )
-            
-            success2 = await self.channels_cog.update_guild_channels(
+            success = await self.channels_cog.update_guild_channels(
                 ctx.guild.id,
+                bet_history_channel=history_channel.id,
                 active_bets_channel=active_channel.id
             )
             
-            if success1 and success2:
+            if success:
                 # Success embed
                 embed = discord.Embed(
                     title="✅ Betting Channels Setup Complete!",
@@ -676,12 +706,9 @@ class ChannelAdmin(commands.Cog):
     
     @setchannel_group.command(name='history')
     @commands.has_permissions(administrator=True)
+    @_require_channels_cog()
     async def set_history_channel(self, ctx, channel: discord.TextChannel):
         """Set the bet history channel"""
-        if not self.channels_cog:
-            await ctx.send("❌ Channels system not available")
-            return
-        
         success = await self.channels_cog.update_guild_channels(
             ctx.guild.id, 
             bet_history_channel=channel.id
@@ -709,12 +736,9 @@ class ChannelAdmin(commands.Cog):
     
     @setchannel_group.command(name='active')
     @commands.has_permissions(administrator=True)
+    @_require_channels_cog()
     async def set_active_channel(self, ctx, channel: discord.TextChannel):
         """Set the active bets channel"""
-        if not self.channels_cog:
-            await ctx.send("❌ Channels system not available")
-            return
-        
         success = await self.channels_cog.update_guild_channels(
             ctx.guild.id, 
             active_bets_channel=channel.id
@@ -742,12 +766,9 @@ class ChannelAdmin(commands.Cog):
     
     @setchannel_group.command(name='view')
     @commands.has_permissions(administrator=True)
+    @_require_channels_cog()
     async def view_channels(self, ctx):
         """View current channel settings"""
-        if not self.channels_cog:
-            await ctx.send("❌ Channels system not available")
-            return
-        
         settings = await self.channels_cog.get_guild_settings(ctx.guild.id)
         
         embed = discord.Embed(
@@ -812,12 +833,9 @@ class ChannelAdmin(commands.Cog):
     
     @setchannel_group.command(name='remove')
     @commands.has_permissions(administrator=True)
+    @_require_channels_cog()
     async def remove_channel(self, ctx, channel_type: str):
         """Remove a channel setting"""
-        if not self.channels_cog:
-            await ctx.send("❌ Channels system not available")
-            return
-        
         channel_type = channel_type.lower()
         if channel_type not in ['history', 'active']:
             await ctx.send("❌ Channel type must be 'history' or 'active'")
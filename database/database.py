@@ -1,98 +1,464 @@
 import aiosqlite
 import asyncio
 import json
+import os
+import sqlite3
+from collections import OrderedDict
+from copy import copy
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
-from typing import Optional, List, Dict, Any
+from pathlib import Path
+from time import monotonic, time
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple, Callable, FrozenSet
 import logging
 from config import Config
 from database.models import DatabaseModels, User
 
 logger = logging.getLogger(__name__)
 
+# Statement text is kept in constants so every call reuses the same prepared statement
+_SQL_SELECT_USER = "SELECT * FROM users WHERE discord_id = ?"
+_SQL_INSERT_USER = """
+    INSERT INTO users (
+        discord_id, username, balance, registration_date, 
+        last_activity, created_at, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_SELECT_BALANCE = "SELECT balance FROM users WHERE discord_id = ?"
+_SQL_UPDATE_BALANCE = "UPDATE users SET balance = ?, updated_at = ? WHERE discord_id = ?"
+_SQL_ADD_BALANCE = (
+    "UPDATE users SET balance = balance + ?, updated_at = ? WHERE discord_id = ? RETURNING balance"
+)
+_SQL_DEDUCT_BALANCE = (
+    "UPDATE users SET balance = balance - ?, updated_at = ? "
+    "WHERE discord_id = ? AND balance >= ? RETURNING balance"
+)
+_SQL_UPDATE_ACTIVITY = "UPDATE users SET last_activity = ?, updated_at = ? WHERE discord_id = ?"
+_SQL_UPDATE_ACTIVITY_AND_NAME = (
+    "UPDATE users SET username = ?, last_activity = ?, updated_at = ? WHERE discord_id = ?"
+)
+_SQL_LEADERBOARD = "SELECT * FROM users ORDER BY balance DESC LIMIT ?"
+_SQL_LEADERBOARD_LIGHT = "SELECT discord_id, username, balance FROM users ORDER BY balance DESC LIMIT ?"
+_SQL_PROFIT_LEADERBOARD = "SELECT discord_id, username, net_profit FROM users ORDER BY net_profit DESC LIMIT ?"
+_SQL_INSERT_TRANSACTION = """
+    INSERT INTO transactions (
+        user_id, amount, transaction_type, reference_id, 
+        balance_before, balance_after, description, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Claim countdowns computed by SQLite; NULL when the user has never claimed
+_SQL_DAILY_SECONDS_LEFT = """
+    SELECT CAST((julianday(last_daily_claim, '+1 day') - julianday('now')) * 86400 AS INTEGER)
+    FROM users WHERE discord_id = ?
+"""
+_SQL_BAILOUT_SECONDS_LEFT = """
+    SELECT CAST((julianday(last_bailout_claim, '+1 day') - julianday('now')) * 86400 AS INTEGER)
+    FROM users WHERE discord_id = ?
+"""
+# Claim eligibility as a single boolean, with no timestamp parsing in Python
+_SQL_CAN_CLAIM_DAILY = """
+    SELECT last_daily_claim IS NULL OR julianday(last_daily_claim) <= julianday('now', '-1 day')
+    FROM users WHERE discord_id = ?
+"""
+_SQL_CAN_CLAIM_BAILOUT = """
+    SELECT balance <= 0
+       AND (last_bailout_claim IS NULL OR julianday(last_bailout_claim) <= julianday('now', '-1 day'))
+    FROM users WHERE discord_id = ?
+"""
+
+# Credit a claim only when it is due; RETURNING yields no row otherwise
+_SQL_CLAIM_DAILY = """
+    UPDATE users SET balance = balance + ?, last_daily_claim = ?, updated_at = ?
+    WHERE discord_id = ?
+      AND (last_daily_claim IS NULL OR julianday(last_daily_claim) <= julianday(?))
+    RETURNING balance
+"""
+_SQL_CLAIM_BAILOUT = """
+    UPDATE users SET balance = balance + ?, last_bailout_claim = ?, updated_at = ?
+    WHERE discord_id = ? AND balance <= 0
+      AND (last_bailout_claim IS NULL OR julianday(last_bailout_claim) <= julianday(?))
+    RETURNING balance
+"""
+# Count a message in its hour bucket; the DO UPDATE predicate applies the
+# cooldown and hourly cap, so a suppressed message changes no rows
+_SQL_TRACK_MESSAGE = """
+    INSERT INTO activity_messages (
+        user_id, guild_id, channel_id, message_count, last_message_time,
+        hour_bucket, created_at, updated_at
+    ) VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+    ON CONFLICT(user_id, guild_id, hour_bucket) DO UPDATE SET
+        message_count = message_count + 1,
+        last_message_time = excluded.last_message_time,
+        updated_at = excluded.updated_at
+    WHERE julianday(last_message_time) <= julianday(?) AND message_count < ?
+"""
+
+# Fold reward rows into the per-day rollup read by get_user_activity_stats
+_SQL_UPSERT_ACTIVITY_DAILY = """
+    INSERT INTO activity_rewards_daily (user_id, guild_id, day, reward_count, total_points, total_messages)
+    VALUES (?, ?, ?, 1, ?, ?)
+    ON CONFLICT(user_id, guild_id, day) DO UPDATE SET
+        reward_count = reward_count + 1,
+        total_points = total_points + excluded.total_points,
+        total_messages = total_messages + excluded.total_messages
+"""
+_SQL_SELECT_ACTIVITY_SETTINGS = "SELECT * FROM activity_settings WHERE guild_id = ?"
+# Static text so the optional guild filter reuses one cached statement
+_SQL_USER_ACTIVITY_STATS = """
+    SELECT COALESCE(SUM(reward_count), 0), COALESCE(SUM(total_points), 0), COALESCE(SUM(total_messages), 0)
+    FROM activity_rewards_daily
+    WHERE user_id = ? AND day BETWEEN ? AND ? AND (? IS NULL OR guild_id = ?)
+"""
+_SQL_INSERT_ACTIVITY_REWARD = """
+    INSERT INTO activity_rewards (
+        user_id, guild_id, points_earned, messages_counted, hour_bucket,
+        bonus_multiplier, processed_at, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Prepared statements kept per connection by sqlite3 (its default is 128)
+_STATEMENT_CACHE_SIZE = 256
+
+# Per-connection read tuning shared by the async and read-only connections
+_READ_PRAGMAS = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",  # 64 MB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MB memory-mapped I/O
+)
+
+# The synchronous read-only connection runs on the event loop thread, so it
+# must never wait long on a lock (WAL readers normally don't wait at all)
+_READ_CONNECTION_TIMEOUT = 0.05  # seconds
+
+# Short-lived cache for users rows read by back-to-back commands
+_USER_CACHE_TTL = 5.0  # seconds
+_USER_CACHE_SIZE = 1024
+
+# Guild activity settings change rarely but are read on every message
+_SETTINGS_CACHE_TTL = 60.0  # seconds
+
+# Activity stats only change when a reward job runs, which clears this cache
+_ACTIVITY_STATS_CACHE_SIZE = 4096
+
+# Ids bound per IN (...) query, kept under SQLite's historical 999-variable limit
+_SQL_MAX_IDS_PER_QUERY = 900
+
+# Transaction types that feed the users betting statistics
+_STATS_TRANSACTION_TYPES = frozenset(('bet_won', 'bet_placed'))
+
+# Recompute a user's betting statistics and return the updated row in one statement
+_REFRESH_AND_FETCH_SQL = """
+    UPDATE users SET
+        (total_bets_placed, total_bets_won) = (
+            SELECT COUNT(*), COUNT(*) FILTER (WHERE status = 'won')
+            FROM user_bets WHERE user_id = ?
+        ),
+        (total_amount_won, total_amount_lost) = (
+            SELECT COALESCE(SUM(amount) FILTER (WHERE transaction_type = 'bet_won'), 0),
+                   COALESCE(SUM(ABS(amount)) FILTER (WHERE transaction_type = 'bet_placed'), 0)
+            FROM transactions WHERE user_id = ? AND transaction_type IN ('bet_won', 'bet_placed')
+        ),
+        updated_at = ?
+    WHERE discord_id = ?
+    RETURNING *
+"""
+
+# Recompute every user's betting statistics from grouped aggregates; users
+# without bets or transactions are reset to zero through the LEFT JOINs
+_REFRESH_ALL_STATS_SQL = """
+    UPDATE users SET
+        total_bets_placed = agg.placed,
+        total_bets_won = agg.won,
+        total_amount_won = agg.won_pts,
+        total_amount_lost = agg.lost_pts,
+        updated_at = ?
+    FROM (
+        SELECT u.discord_id AS user_id,
+               COALESCE(b.placed, 0) AS placed,
+               COALESCE(b.won, 0) AS won,
+               COALESCE(t.won_pts, 0) AS won_pts,
+               COALESCE(t.lost_pts, 0) AS lost_pts
+        FROM users u
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS placed, SUM(status = 'won') AS won
+            FROM user_bets GROUP BY user_id
+        ) b ON b.user_id = u.discord_id
+        LEFT JOIN (
+            SELECT user_id,
+                   SUM(CASE WHEN transaction_type = 'bet_won' THEN amount ELSE 0 END) AS won_pts,
+                   SUM(CASE WHEN transaction_type = 'bet_placed' THEN ABS(amount) ELSE 0 END) AS lost_pts
+            FROM transactions
+            WHERE transaction_type IN ('bet_won', 'bet_placed')
+            GROUP BY user_id
+        ) t ON t.user_id = u.discord_id
+    ) AS agg
+    WHERE users.discord_id = agg.user_id
+"""
+
+def _utc_now_iso() -> str:
+    """Current UTC time in the ISO-8601 text format stored in the TEXT timestamp columns"""
+    return datetime.now(timezone.utc).isoformat()
+
+def _epoch_hour(dt: datetime) -> int:
+    """Hours since the Unix epoch for an aware datetime: the activity hour_bucket key"""
+    return int(dt.timestamp()) // 3600
+
+def _epoch_day_range(days: int) -> Tuple[int, int]:
+    """(start, end) epoch days, inclusive, covering the last `days` days including today"""
+    end = int(time()) // 86400
+    return end - days + 1, end
+
+_NO_IDS: FrozenSet[int] = frozenset()
+
+def _load_id_set(text: Optional[str]) -> FrozenSet[int]:
+    """Decode a JSON id-list column into a frozenset, skipping the parser for the common empty case"""
+    if not text or text == '[]':
+        return _NO_IDS
+    return frozenset(json.loads(text))
+
+@asynccontextmanager
+async def _write_tx(conn: aiosqlite.Connection) -> AsyncIterator[None]:
+    """Run a block of writes in a BEGIN IMMEDIATE transaction and commit it
+    
+    The write lock is taken up front instead of being upgraded mid-transaction.
+    An already open transaction means some write ran outside transaction(); it
+    isn't ours to commit or roll back, so that is reported instead of joined.
+    """
+    if conn.in_transaction:
+        raise RuntimeError("Shared connection has an open transaction that transaction() did not start")
+    await conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        await conn.rollback()
+        raise
+    await conn.commit()
+
 class DatabaseManager:
     """Manages database connections and operations"""
     
     def __init__(self, db_path: str = None):
         self.db_path = db_path or Config.DATABASE_PATH
-        self._connection_pool = {}
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._init_lock = asyncio.Lock()
+        # Serializes write transactions on the shared connection; the owning
+        # task is tracked so nested manager calls join the outer transaction
+        self._write_lock = asyncio.Lock()
+        self._write_owner: Optional[asyncio.Task] = None
+        self._read_connection: Optional[sqlite3.Connection] = None
+        # Called when a transaction() block fails, so caches filled inside it can be dropped
+        self._rollback_listeners: List[Callable[[], None]] = []
         
     async def get_connection(self) -> aiosqlite.Connection:
-        """Get database connection with connection pooling"""
-        task_id = id(asyncio.current_task())
+        """Get the shared long-lived database connection, opening it on first use
         
-        if task_id not in self._connection_pool:
-            conn = await aiosqlite.connect(self.db_path)
+        Every task shares this one connection, so a commit or rollback on it
+        applies to whatever any task has pending. Use it only for reads; writes
+        go through transaction(), which serializes writers and owns the commit.
+        """
+        if self._connection is not None:
+            return self._connection
+        
+        async with self._init_lock:
+            if self._connection is not None:
+                return self._connection
+            
+            # Every hot statement is a module-level constant, so a larger
+            # statement cache keeps them all prepared on the shared connection
+            conn = await aiosqlite.connect(self.db_path, cached_statements=_STATEMENT_CACHE_SIZE)
             conn.row_factory = aiosqlite.Row
-            self._connection_pool[task_id] = conn
             
-        return self._connection_pool[task_id]
+            # Connection-level settings are applied once for the bot's lifetime
+            await conn.execute("PRAGMA journal_mode=WAL")
+            await conn.execute("PRAGMA synchronous=NORMAL")
+            await conn.execute("PRAGMA busy_timeout=5000")
+            for pragma in _READ_PRAGMAS:
+                await conn.execute(pragma)
+            
+            self._connection = conn
+            return conn
     
-    async def close_connection(self):
-        """Close database connection for current task"""
-        task_id = id(asyncio.current_task())
-        if task_id in self._connection_pool:
-            await self._connection_pool[task_id].close()
-            del self._connection_pool[task_id]
+    def get_read_connection(self) -> sqlite3.Connection:
+        """Get a synchronous read-only connection for cheap point reads
+        
+        Reads through it skip aiosqlite's worker-thread round trip. Under WAL
+        they see the latest committed data without blocking the writer, but
+        never the shared connection's uncommitted writes.
+        """
+        if self._read_connection is None:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(
+                uri, uri=True, check_same_thread=False,
+                timeout=_READ_CONNECTION_TIMEOUT, cached_statements=_STATEMENT_CACHE_SIZE
+            )
+            conn.row_factory = sqlite3.Row
+            # Page cache and mmap are per connection; journal mode is fixed by the writer
+            for pragma in _READ_PRAGMAS:
+                conn.execute(pragma)
+            self._read_connection = conn
+        
+        return self._read_connection
+    
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow the database connection for a block of read statements
+        
+        SQLite allows a single writer, so every borrower shares one WAL
+        connection rather than a pool whose members would block each other on
+        the write lock. Like get_connection(), this is for reads only.
+        """
+        yield await self.get_connection()
+    
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Run a block of writes as one BEGIN IMMEDIATE transaction
+        
+        Writers are serialized on an asyncio lock so concurrent tasks never
+        interleave statements in the shared connection's transaction. The block
+        commits on exit and rolls back on error; a nested call from the task that
+        already holds the lock simply joins the outer transaction. Manager write
+        methods each open one, so they work standalone, and a command handler can
+        wrap several of them in an outer block to pay for a single commit.
+        """
+        conn = await self.get_connection()
+        task = asyncio.current_task()
+        if self._write_owner is task:
+            yield conn
+            return
+        
+        async with self._write_lock:
+            self._write_owner = task
+            try:
+                async with _write_tx(conn):
+                    yield conn
+            except BaseException:
+                for listener in self._rollback_listeners:
+                    listener()
+                raise
+            finally:
+                self._write_owner = None
+    
+    def add_rollback_listener(self, listener: Callable[[], None]) -> None:
+        """Register a callback to run whenever a transaction() block rolls back"""
+        self._rollback_listeners.append(listener)
     
     async def initialize_database(self):
         """Initialize database with tables"""
+        # The data directory has to exist before the first connect creates the file
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        
         conn = await self.get_connection()
         await DatabaseModels.create_tables(conn)
         
-        # Create data directory if it doesn't exist
-        import os
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        
         logger.info(f"Database initialized at {self.db_path}")
     
     async def close_all_connections(self):
-        """Close all database connections"""
-        for conn in self._connection_pool.values():
-            await conn.close()
-        self._connection_pool.clear()
+        """Close the shared database connection and the read-only connection"""
+        if self._read_connection is not None:
+            self._read_connection.close()
+            self._read_connection = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
 
 class UserManager:
     """Manages user-related database operations"""
     
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
+        # discord_id -> (fetched_at, User); bounded LRU with a short TTL
+        self._user_cache: OrderedDict[int, Tuple[float, User]] = OrderedDict()
+        self._inflight: Dict[int, asyncio.Future] = {}
+        # Stats dirty tracking: bumped on bet writes, stamped when stats are recomputed.
+        # A user with no stamp (e.g. after a restart) is refreshed once on first read.
+        self._stats_version: Dict[int, int] = {}
+        self._stats_fresh_version: Dict[int, int] = {}
+        db_manager.add_rollback_listener(self._on_rollback)
+    
+    def _on_rollback(self) -> None:
+        """Forget rows cached or stamped inside a transaction that was rolled back"""
+        self._user_cache.clear()
+        self._stats_fresh_version.clear()
+    
+    def _cache_user(self, user: User) -> None:
+        """Store a freshly read user row in the cache"""
+        self._user_cache[user.discord_id] = (monotonic(), user)
+        self._user_cache.move_to_end(user.discord_id)
+        if len(self._user_cache) > _USER_CACHE_SIZE:
+            self._user_cache.popitem(last=False)
+    
+    def _invalidate_user(self, discord_id: int) -> None:
+        """Drop a cached user after a write to their row"""
+        self._user_cache.pop(discord_id, None)
+    
+    def _cached_user(self, discord_id: int) -> Optional[User]:
+        """Return a copy of a cached user if the entry is still fresh"""
+        cached = self._user_cache.get(discord_id)
+        if cached and monotonic() - cached[0] < _USER_CACHE_TTL:
+            return copy(cached[1])
+        return None
     
     async def get_user(self, discord_id: int) -> Optional[User]:
         """Get user by Discord ID"""
-        conn = await self.db.get_connection()
-        cursor = await conn.execute(
-            "SELECT * FROM users WHERE discord_id = ?", 
-            (discord_id,)
-        )
-        row = await cursor.fetchone()
-        return User.from_db_row(row)
+        user = self._cached_user(discord_id)
+        if user:
+            return user
+        
+        # Concurrent misses for the same user await the SELECT already in flight
+        inflight = self._inflight.get(discord_id)
+        if inflight is not None:
+            user = await asyncio.shield(inflight)
+            return copy(user) if user else None
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[discord_id] = future
+        try:
+            async with self.db.acquire() as conn:
+                cursor = await conn.execute(_SQL_SELECT_USER, (discord_id,))
+                row = await cursor.fetchone()
+            
+            user = User.from_db_row(row)
+            if user:
+                self._cache_user(user)
+            future.set_result(user)
+        except BaseException as e:
+            # CancelledError can't be stored on a future; waiters see a RuntimeError instead
+            future.set_exception(e if isinstance(e, Exception) else RuntimeError("User lookup cancelled"))
+            future.exception()  # mark retrieved so a failure nobody waited on isn't logged
+            raise
+        finally:
+            del self._inflight[discord_id]
+        
+        return copy(user) if user else None
     
     async def create_user(self, discord_id: int, username: str, starting_balance: int = None) -> User:
         """Create new user with auto-registration"""
         if starting_balance is None:
             starting_balance = Config.DEFAULT_BALANCE
             
-        now = datetime.now(timezone.utc).isoformat()
+        now = _utc_now_iso()
         
-        conn = await self.db.get_connection()
-        await conn.execute("""
-            INSERT INTO users (
-                discord_id, username, balance, registration_date, 
-                last_activity, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (discord_id, username, starting_balance, now, now, now, now))
-        
-        await conn.commit()
-        
-        # Log the registration transaction
-        await self.add_transaction(
-            discord_id, starting_balance, 'admin_adjustment', 
-            description=f"Initial registration bonus", 
-            balance_before=0, balance_after=starting_balance
+        # The user row and its registration audit entry commit together
+        async with self.db.transaction() as conn:
+            await conn.execute(
+                _SQL_INSERT_USER,
+                (discord_id, username, starting_balance, now, now, now, now)
+            )
+            await self._insert_transaction(
+                conn, discord_id, starting_balance, 'admin_adjustment', None,
+                "Initial registration bonus", 0, starting_balance, now
+            )
+        
+        # Every other column takes its table default, so the row needn't be read back
+        user = User(
+            discord_id=discord_id, username=username, balance=starting_balance,
+            registration_date=now, last_activity=now, created_at=now, updated_at=now
         )
+        self._cache_user(user)
         
         logger.info(f"Created new user: {username} ({discord_id}) with {starting_balance} points")
-        return await self.get_user(discord_id)
+        return copy(user)
     
     async def get_or_create_user(self, discord_id: int, username: str) -> tuple[User, bool]:
         """Get existing user or create new one (auto-registration)"""
@@ -111,164 +477,246 @@ class UserManager:
     
     async def update_balance(self, discord_id: int, new_balance: int) -> bool:
         """Update user balance"""
-        now = datetime.now(timezone.utc).isoformat()
+        now = _utc_now_iso()
         
-        conn = await self.db.get_connection()
-        cursor = await conn.execute(
-            "UPDATE users SET balance = ?, updated_at = ? WHERE discord_id = ?",
-            (new_balance, now, discord_id)
-        )
-        await conn.commit()
+        async with self.db.transaction() as conn:
+            cursor = await conn.execute(_SQL_UPDATE_BALANCE, (new_balance, now, discord_id))
+        self._invalidate_user(discord_id)
         
         return cursor.rowcount > 0
     
+    async def set_balance(self, discord_id: int, new_balance: int, transaction_type: str,
+                          description: str = None) -> Optional[int]:
+        """Overwrite a user's balance and log the difference; returns the old balance or None"""
+        now = _utc_now_iso()
+        
+        # The read and the write share one BEGIN IMMEDIATE transaction, so the
+        # logged difference can't be invalidated by a concurrent balance change
+        async with self.db.transaction() as conn:
+            async with conn.execute(_SQL_SELECT_BALANCE, (discord_id,)) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return None
+            
+            old_balance = row[0]
+            await conn.execute(_SQL_UPDATE_BALANCE, (new_balance, now, discord_id))
+            await self._insert_transaction(
+                conn, discord_id, new_balance - old_balance, transaction_type, None,
+                description, old_balance, new_balance, now
+            )
+        
+        self._invalidate_user(discord_id)
+        return old_balance
+    
     async def add_points(self, discord_id: int, amount: int, transaction_type: str, 
-                        reference_id: int = None, description: str = None) -> bool:
+                        reference_id: int = None, description: str = None,
+                        now: str = None) -> bool:
         """Add points to user balance with transaction logging"""
-        user = await self.get_user(discord_id)
-        if not user:
-            return False
-        
-        old_balance = user.balance
-        new_balance = old_balance + amount
+        now = now or _utc_now_iso()
         
-        # Update balance
-        success = await self.update_balance(discord_id, new_balance)
-        if success:
-            # Log transaction
-            await self.add_transaction(
-                discord_id, amount, transaction_type, 
-                reference_id, description, old_balance, new_balance
+        async with self.db.transaction() as conn:
+            async with conn.execute(_SQL_ADD_BALANCE, (amount, now, discord_id)) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return False
+            
+            # Balance change and audit row share one transaction
+            new_balance = row[0]
+            await self._insert_transaction(
+                conn, discord_id, amount, transaction_type, reference_id,
+                description, new_balance - amount, new_balance, now
             )
         
-        return success
+        self._invalidate_user(discord_id)
+        if transaction_type in _STATS_TRANSACTION_TYPES:
+            self.mark_stats_dirty(discord_id)
+        return True
     
     async def deduct_points(self, discord_id: int, amount: int, transaction_type: str,
-                           reference_id: int = None, description: str = None) -> bool:
+                           reference_id: int = None, description: str = None,
+                           now: str = None) -> bool:
         """Deduct points from user balance with transaction logging"""
-        user = await self.get_user(discord_id)
-        if not user or user.balance < amount:
-            return False
-        
-        old_balance = user.balance
-        new_balance = old_balance - amount
+        now = now or _utc_now_iso()
         
-        # Update balance
-        success = await self.update_balance(discord_id, new_balance)
-        if success:
-            # Log transaction
-            await self.add_transaction(
-                discord_id, -amount, transaction_type,
-                reference_id, description, old_balance, new_balance
+        async with self.db.transaction() as conn:
+            # The balance >= amount predicate makes the funds check part of the write
+            async with conn.execute(_SQL_DEDUCT_BALANCE, (amount, now, discord_id, amount)) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return False
+            
+            new_balance = row[0]
+            await self._insert_transaction(
+                conn, discord_id, -amount, transaction_type, reference_id,
+                description, new_balance + amount, new_balance, now
             )
         
-        return success
+        self._invalidate_user(discord_id)
+        if transaction_type in _STATS_TRANSACTION_TYPES:
+            self.mark_stats_dirty(discord_id)
+        return True
+    
+    async def add_points_many(self, entries: List[Tuple[int, int, str, Optional[int], Optional[str]]],
+                              now: str = None) -> int:
+        """Add points to several users with one commit for all balance changes and audit rows"""
+        # entries: (discord_id, amount, transaction_type, reference_id, description)
+        if not entries:
+            return 0
+        
+        now = now or _utc_now_iso()
+        logged = []
+        
+        async with self.db.transaction() as conn:
+            for discord_id, amount, transaction_type, reference_id, description in entries:
+                async with conn.execute(_SQL_ADD_BALANCE, (amount, now, discord_id)) as cursor:
+                    row = await cursor.fetchone()
+                if row is None:
+                    continue
+                
+                new_balance = row[0]
+                logged.append((
+                    discord_id, amount, transaction_type, reference_id,
+                    new_balance - amount, new_balance, description, now
+                ))
+            
+            await conn.executemany(_SQL_INSERT_TRANSACTION, logged)
+        
+        for discord_id, _, transaction_type, *_ in logged:
+            self._invalidate_user(discord_id)
+            if transaction_type in _STATS_TRANSACTION_TYPES:
+                self.mark_stats_dirty(discord_id)
+        
+        return len(logged)
     
     async def update_user_activity(self, discord_id: int, username: str = None):
         """Update user's last activity timestamp"""
-        now = datetime.now(timezone.utc).isoformat()
+        now = _utc_now_iso()
         
-        conn = await self.db.get_connection()
-        if username:
-            await conn.execute(
-                "UPDATE users SET username = ?, last_activity = ?, updated_at = ? WHERE discord_id = ?",
-                (username, now, now, discord_id)
-            )
-        else:
-            await conn.execute(
-                "UPDATE users SET last_activity = ?, updated_at = ? WHERE discord_id = ?",
-                (now, now, discord_id)
-            )
-        await conn.commit()
+        async with self.db.transaction() as conn:
+            if username:
+                await conn.execute(_SQL_UPDATE_ACTIVITY_AND_NAME, (username, now, now, discord_id))
+            else:
+                await conn.execute(_SQL_UPDATE_ACTIVITY, (now, now, discord_id))
+        self._invalidate_user(discord_id)
+    
+    async def _seconds_until_claim(self, sql: str, discord_id: int) -> tuple[bool, Optional[int]]:
+        """Run a claim countdown query: (user exists, seconds left or None if never claimed)"""
+        async with self.db.acquire() as conn:
+            async with conn.execute(sql, (discord_id,)) as cursor:
+                row = await cursor.fetchone()
+        if row is None:
+            return False, None
+        return True, row[0]
+    
+    async def get_daily_seconds_left(self, discord_id: int) -> Optional[int]:
+        """Seconds until the next daily bonus (<= 0 when due), or None if never claimed"""
+        return (await self._seconds_until_claim(_SQL_DAILY_SECONDS_LEFT, discord_id))[1]
+    
+    async def get_bailout_seconds_left(self, discord_id: int) -> Optional[int]:
+        """Seconds until the next bailout (<= 0 when due), or None if never claimed"""
+        return (await self._seconds_until_claim(_SQL_BAILOUT_SECONDS_LEFT, discord_id))[1]
+    
+    def _claim_due(self, sql: str, discord_id: int) -> Optional[bool]:
+        """Run a claim eligibility query: None if the user doesn't exist"""
+        # Deliberately a blocking read on the event loop: one primary-key lookup on
+        # the read-only connection, which never waits on the writer under WAL and
+        # gives up after _READ_CONNECTION_TIMEOUT, costs less than a thread hop
+        row = self.db.get_read_connection().execute(sql, (discord_id,)).fetchone()
+        return None if row is None else bool(row[0])
     
     async def can_claim_daily(self, discord_id: int) -> bool:
         """Check if user can claim daily bonus"""
-        user = await self.get_user(discord_id)
-        if not user or not user.last_daily_claim:
-            return True
-        
-        # Check if 24 hours have passed
-        last_claim = datetime.fromisoformat(user.last_daily_claim.replace('Z', '+00:00'))
-        next_claim = last_claim + timedelta(hours=24)
-        
-        return datetime.now(timezone.utc) >= next_claim
+        due = self._claim_due(_SQL_CAN_CLAIM_DAILY, discord_id)
+        # Unknown users haven't claimed yet
+        return due is None or due
     
     async def claim_daily_bonus(self, discord_id: int) -> tuple[bool, int]:
-        """Claim daily bonus if available"""
-        if not await self.can_claim_daily(discord_id):
-            return False, 0
-        
+        """Claim daily bonus if available (the UPDATE only matches when a claim is due)"""
         bonus_amount = Config.DAILY_BONUS
-        now = datetime.now(timezone.utc).isoformat()
-        
-        # Update last claim time
-        conn = await self.db.get_connection()
-        await conn.execute(
-            "UPDATE users SET last_daily_claim = ?, updated_at = ? WHERE discord_id = ?",
-            (now, now, discord_id)
-        )
-        await conn.commit()
+        now_dt = datetime.now(timezone.utc)
+        now = now_dt.isoformat()
+        cutoff = (now_dt - timedelta(hours=24)).isoformat()
         
-        # Add points
-        success = await self.add_points(
-            discord_id, bonus_amount, 'daily_bonus',
-            description="Daily bonus claimed"
-        )
+        async with self.db.transaction() as conn:
+            async with conn.execute(
+                _SQL_CLAIM_DAILY, (bonus_amount, now, now, discord_id, cutoff)
+            ) as cursor:
+                row = await cursor.fetchone()
+            
+            if row is None:
+                return False, 0
+            
+            new_balance = row[0]
+            await self._insert_transaction(
+                conn, discord_id, bonus_amount, 'daily_bonus', None,
+                "Daily bonus claimed", new_balance - bonus_amount, new_balance, now
+            )
         
-        return success, bonus_amount if success else 0
+        self._invalidate_user(discord_id)
+        return True, bonus_amount
     
     async def can_claim_bailout(self, discord_id: int) -> bool:
         """Check if user can claim bailout (emergency points)"""
-        user = await self.get_user(discord_id)
-        if not user or user.balance > 0:
-            return False
-        
-        if not user.last_bailout_claim:
-            return True
-        
-        # Check if 24 hours have passed
-        last_claim = datetime.fromisoformat(user.last_bailout_claim.replace('Z', '+00:00'))
-        next_claim = last_claim + timedelta(hours=24)
-        
-        return datetime.now(timezone.utc) >= next_claim
+        return bool(self._claim_due(_SQL_CAN_CLAIM_BAILOUT, discord_id))
     
     async def claim_bailout(self, discord_id: int) -> tuple[bool, int]:
-        """Claim bailout if available"""
-        if not await self.can_claim_bailout(discord_id):
-            return False, 0
-        
+        """Claim bailout if available (the UPDATE only matches a broke user whose bailout is due)"""
         bailout_amount = Config.BAILOUT_AMOUNT
-        now = datetime.now(timezone.utc).isoformat()
-        
-        # Update last bailout time
-        conn = await self.db.get_connection()
-        await conn.execute(
-            "UPDATE users SET last_bailout_claim = ?, updated_at = ? WHERE discord_id = ?",
-            (now, now, discord_id)
-        )
-        await conn.commit()
+        now_dt = datetime.now(timezone.utc)
+        now = now_dt.isoformat()
+        cutoff = (now_dt - timedelta(hours=24)).isoformat()
         
-        # Add points
-        success = await self.add_points(
-            discord_id, bailout_amount, 'bailout',
-            description="Emergency bailout claimed"
-        )
+        async with self.db.transaction() as conn:
+            async with conn.execute(
+                _SQL_CLAIM_BAILOUT, (bailout_amount, now, now, discord_id, cutoff)
+            ) as cursor:
+                row = await cursor.fetchone()
+            
+            if row is None:
+                return False, 0
+            
+            new_balance = row[0]
+            await self._insert_transaction(
+                conn, discord_id, bailout_amount, 'bailout', None,
+                "Emergency bailout claimed", new_balance - bailout_amount, new_balance, now
+            )
         
-        return success, bailout_amount if success else 0
+        self._invalidate_user(discord_id)
+        return True, bailout_amount
     
     async def get_leaderboard(self, limit: int = 10) -> List[User]:
         """Get top users by balance"""
-        conn = await self.db.get_connection()
-        cursor = await conn.execute(
-            "SELECT * FROM users ORDER BY balance DESC LIMIT ?", 
-            (limit,)
-        )
-        rows = await cursor.fetchall()
-        return [User.from_db_row(row) for row in rows]
+        async with self.db.acquire() as conn:
+            cursor = await conn.execute(_SQL_LEADERBOARD, (limit,))
+            rows = await cursor.fetchall()
+        return User.from_db_rows(rows)
+    
+    async def get_leaderboard_light(self, limit: int = 10) -> List[Tuple[int, str, int]]:
+        """Get top users by balance as (discord_id, username, balance) tuples for display"""
+        async with self.db.acquire() as conn:
+            cursor = await conn.execute(_SQL_LEADERBOARD_LIGHT, (limit,))
+            rows = await cursor.fetchall()
+        return [tuple(row) for row in rows]
+    
+    async def get_profit_leaderboard(self, limit: int = 10) -> List[Tuple[int, str, int]]:
+        """Get top users by net betting profit as (discord_id, username, net_profit) tuples
+        
+        Stats are recomputed lazily, so call refresh_all_user_stats first when
+        every user's profit must be current.
+        """
+        async with self.db.acquire() as conn:
+            cursor = await conn.execute(_SQL_PROFIT_LEADERBOARD, (limit,))
+            rows = await cursor.fetchall()
+        return [tuple(row) for row in rows]
+    
+    def mark_stats_dirty(self, discord_id: int) -> None:
+        """Flag a user's betting stats for recomputation on their next stats read"""
+        self._stats_version[discord_id] = self._stats_version.get(discord_id, 0) + 1
     
     async def add_transaction(self, user_id: int, amount: int, transaction_type: str,
                              reference_id: int = None, description: str = None,
-                             balance_before: int = None, balance_after: int = None):
+                             balance_before: int = None, balance_after: int = None,
+                             now: str = None):
         """Add transaction to audit trail"""
         if balance_before is None or balance_after is None:
             user = await self.get_user(user_id)
@@ -276,107 +724,112 @@ class UserManager:
                 balance_before = balance_before or user.balance
                 balance_after = balance_after or user.balance
         
-        now = datetime.now(timezone.utc).isoformat()
+        now = now or _utc_now_iso()
         
-        conn = await self.db.get_connection()
-        await conn.execute("""
-            INSERT INTO transactions (
-                user_id, amount, transaction_type, reference_id, 
-                balance_before, balance_after, description, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (user_id, amount, transaction_type, reference_id, 
-              balance_before, balance_after, description, now))
+        async with self.db.transaction() as conn:
+            await self._insert_transaction(
+                conn, user_id, amount, transaction_type, reference_id,
+                description, balance_before, balance_after, now
+            )
         
-        await conn.commit()
+        if transaction_type in _STATS_TRANSACTION_TYPES:
+            self.mark_stats_dirty(user_id)
+    
+    @staticmethod
+    async def _insert_transaction(conn: aiosqlite.Connection, user_id: int, amount: int,
+                                  transaction_type: str, reference_id: Optional[int],
+                                  description: Optional[str], balance_before: Optional[int],
+                                  balance_after: Optional[int], created_at: str):
+        """Write an audit trail row on conn without committing"""
+        await conn.execute(_SQL_INSERT_TRANSACTION, (
+            user_id, amount, transaction_type, reference_id,
+            balance_before, balance_after, description, created_at
+        ))
     
     async def update_betting_stats(self, user_id: int):
         """Calculate and update user's betting statistics from actual bet data"""
-        conn = await self.db.get_connection()
+        version = self._stats_version.get(user_id, 0)
+        now = _utc_now_iso()
         
-        # Calculate total bets placed
-        cursor = await conn.execute(
-            "SELECT COUNT(*) FROM user_bets WHERE user_id = ?",
-            (user_id,)
-        )
-        total_bets_placed = (await cursor.fetchone())[0]
+        # One UPDATE with correlated aggregates replaces four SELECTs + UPDATE
+        async with self.db.transaction() as conn:
+            rows = await conn.execute_fetchall(
+                _REFRESH_AND_FETCH_SQL,
+                (user_id, user_id, now, user_id)
+            )
         
-        # Calculate total bets won
-        cursor = await conn.execute(
-            "SELECT COUNT(*) FROM user_bets WHERE user_id = ? AND status = 'won'",
-            (user_id,)
-        )
-        total_bets_won = (await cursor.fetchone())[0]
+        user = User.from_db_row(rows[0]) if rows else None
+        if user:
+            self._cache_user(user)
+            self._stats_fresh_version[user_id] = version
+        else:
+            self._invalidate_user(user_id)
         
-        # Calculate total amount won (from bet winnings transactions)
-        cursor = await conn.execute(
-            "SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE user_id = ? AND transaction_type = 'bet_won'",
-            (user_id,)
-        )
-        total_amount_won = (await cursor.fetchone())[0]
+        stats = {
+            'total_bets_placed': user.total_bets_placed if user else 0,
+            'total_bets_won': user.total_bets_won if user else 0,
+            'total_amount_won': user.total_amount_won if user else 0,
+            'total_amount_lost': user.total_amount_lost if user else 0
+        }
         
-        # Calculate total amount lost (from bet placement transactions)
-        cursor = await conn.execute(
-            "SELECT COALESCE(SUM(ABS(amount)), 0) FROM transactions WHERE user_id = ? AND transaction_type = 'bet_placed'",
-            (user_id,)
-        )
-        total_amount_lost = (await cursor.fetchone())[0]
+        logger.info(f"Updated betting stats for user {user_id}: {stats['total_bets_placed']} bets, {stats['total_bets_won']} won, {stats['total_amount_won']} won points, {stats['total_amount_lost']} lost points")
         
-        # Update user statistics
-        now = datetime.now(timezone.utc).isoformat()
-        await conn.execute("""
-            UPDATE users SET 
-                total_bets_placed = ?, 
-                total_bets_won = ?, 
-                total_amount_won = ?, 
-                total_amount_lost = ?, 
-                updated_at = ?
-            WHERE discord_id = ?
-        """, (total_bets_placed, total_bets_won, total_amount_won, total_amount_lost, now, user_id))
+        return stats
+    
+    async def get_user_with_fresh_stats(self, discord_id: int) -> Optional[User]:
+        """Get user with up-to-date betting statistics (one UPDATE ... RETURNING round-trip)"""
+        # Nothing bet-related changed since the last recompute: a plain read is enough
+        version = self._stats_version.get(discord_id, 0)
+        if self._stats_fresh_version.get(discord_id) == version:
+            return await self.get_user(discord_id)
         
-        await conn.commit()
+        now = _utc_now_iso()
         
-        logger.info(f"Updated betting stats for user {user_id}: {total_bets_placed} bets, {total_bets_won} won, {total_amount_won} won points, {total_amount_lost} lost points")
+        async with self.db.transaction() as conn:
+            rows = await conn.execute_fetchall(
+                _REFRESH_AND_FETCH_SQL,
+                (discord_id, discord_id, now, discord_id)
+            )
         
-        return {
-            'total_bets_placed': total_bets_placed,
-            'total_bets_won': total_bets_won,
-            'total_amount_won': total_amount_won,
-            'total_amount_lost': total_amount_lost
-        }
-    
-    async def get_user_with_fresh_stats(self, discord_id: int) -> Optional[User]:
-        """Get user with up-to-date betting statistics"""
-        user = await self.get_user(discord_id)
-        if user:
-            await self.update_betting_stats(discord_id)
-            # Fetch again to get updated stats
-            user = await self.get_user(discord_id)
-        return user
+        if not rows:
+            return None
+        
+        user = User.from_db_row(rows[0])
+        self._cache_user(user)
+        self._stats_fresh_version[discord_id] = version
+        return copy(user)
     
     async def refresh_all_user_stats(self) -> int:
-        """Refresh betting statistics for all users"""
-        conn = await self.db.get_connection()
-        cursor = await conn.execute("SELECT discord_id FROM users")
-        user_ids = [row[0] for row in await cursor.fetchall()]
+        """Refresh betting statistics for all users in one set-based UPDATE"""
+        now = _utc_now_iso()
         
-        count = 0
-        for user_id in user_ids:
-            await self.update_betting_stats(user_id)
-            count += 1
+        async with self.db.transaction() as conn:
+            cursor = await conn.execute(_REFRESH_ALL_STATS_SQL, (now,))
+            count = cursor.rowcount
         
+        self._user_cache.clear()
         logger.info(f"Refreshed betting statistics for {count} users")
         return count
 
 class ActivityManager:
     """Manage activity tracking and rewards"""
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, user_manager: UserManager):
         self.db = db_manager
+        self.users = user_manager
+        self._settings_cache: Dict[int, Dict[str, Any]] = {}
+        self._settings_cache_ts: Dict[int, float] = {}
+        # (user_id, guild_id, days) -> (end_day, stats); bounded LRU. The rollup only
+        # changes when rewards are paid (which clears it) or when the window slides
+        # to a new day, so an entry stays valid for the rest of its end_day
+        self._stats_cache: OrderedDict[Tuple[int, Optional[int], int], Tuple[int, Dict[str, Any]]] = OrderedDict()
+        # A read made while a reward run was open may have seen rows that rolled back
+        db_manager.add_rollback_listener(self._stats_cache.clear)
     
     async def track_message(self, user_id: int, guild_id: int, channel_id: int, message_length: int) -> bool:
         """Track a message for activity rewards (returns True if tracked, False if on cooldown)"""
         now = datetime.now(timezone.utc)
-        hour_bucket = now.strftime('%Y-%m-%d-%H')
+        hour_bucket = _epoch_hour(now)
         now_str = now.isoformat()
         
         # Check settings for this guild
@@ -388,237 +841,217 @@ class ActivityManager:
         if message_length < settings.get('min_message_length', 3):
             return False
         
-        conn = await self.db.get_connection()
+        cooldown_cutoff = (now - timedelta(seconds=settings.get('message_cooldown', 600))).isoformat()
+        max_messages = settings.get('max_messages_per_hour', 50)
         
         try:
-            # Check if user has existing record for this hour
-            existing = await conn.execute(
-                "SELECT message_count, last_message_time FROM activity_messages WHERE user_id = ? AND guild_id = ? AND hour_bucket = ?",
-                (user_id, guild_id, hour_bucket)
-            )
-            row = await existing.fetchone()
-            
-            if row:
-                message_count, last_message_time = row
-                
-                # Check cooldown
-                last_time = datetime.fromisoformat(last_message_time)
-                cooldown_seconds = settings.get('message_cooldown', 600)
-                if (now - last_time).total_seconds() < cooldown_seconds:
-                    return False
-                
-                # Check max messages per hour
-                max_messages = settings.get('max_messages_per_hour', 50)
-                if message_count >= max_messages:
-                    return False
-                
-                # Update existing record
-                await conn.execute("""
-                    UPDATE activity_messages 
-                    SET message_count = message_count + 1, last_message_time = ?, updated_at = ?
-                    WHERE user_id = ? AND guild_id = ? AND hour_bucket = ?
-                """, (now_str, now_str, user_id, guild_id, hour_bucket))
-            else:
-                # Create new record
-                await conn.execute("""
-                    INSERT INTO activity_messages (user_id, guild_id, channel_id, message_count, last_message_time, hour_bucket, created_at, updated_at)
-                    VALUES (?, ?, ?, 1, ?, ?, ?, ?)
-                """, (user_id, guild_id, channel_id, now_str, hour_bucket, now_str, now_str))
+            async with self.db.transaction() as conn:
+                cursor = await conn.execute(_SQL_TRACK_MESSAGE, (
+                    user_id, guild_id, channel_id, now_str, hour_bucket, now_str, now_str,
+                    cooldown_cutoff, max_messages
+                ))
             
-            await conn.commit()
-            return True
+            # No row changed: still on cooldown or at the hourly cap
+            return cursor.rowcount > 0
             
         except Exception as e:
             logger.error(f"Error tracking message: {e}")
-            await conn.rollback()
             return False
     
     async def process_daily_rewards(self, guild_id: int = None) -> Dict[str, int]:
         """Process activity rewards for the last 24 hours (daily batch)"""
         now = datetime.now(timezone.utc)
+        now_str = now.isoformat()
         # Process last 24 hours of activity
         end_time = now.replace(hour=0, minute=0, second=0, microsecond=0)  # Start of today
         start_time = end_time - timedelta(days=1)  # Start of yesterday
         
-        # Create day bucket for tracking (YYYY-MM-DD format)
-        day_bucket = end_time.strftime('%Y-%m-%d')
+        # Create day bucket for tracking (the first epoch hour of today)
+        day_bucket = _epoch_hour(end_time)
         
-        conn = await self.db.get_connection()
         results = {'users_processed': 0, 'total_points_awarded': 0, 'guilds_processed': 0}
         
         try:
-            # Get all activity for the last 24 hours (sum by user and guild)
-            query = """
-                SELECT user_id, guild_id, SUM(message_count) as total_messages
-                FROM activity_messages 
-                WHERE hour_bucket >= ? AND hour_bucket < ?
-                GROUP BY user_id, guild_id
-            """
-            start_bucket = start_time.strftime('%Y-%m-%d-%H')
-            end_bucket = end_time.strftime('%Y-%m-%d-%H')
-            params = [start_bucket, end_bucket]
+            async with self.db.transaction() as conn:
+                # Get all activity for the last 24 hours (sum by user and guild),
+                # alongside the message count already rewarded for this day
+                query = """
+                    SELECT am.user_id, am.guild_id, SUM(am.message_count) as total_messages,
+                        COALESCE((
+                            SELECT ar.messages_counted FROM activity_rewards ar
+                            WHERE ar.user_id = am.user_id AND ar.guild_id = am.guild_id AND ar.hour_bucket = ?
+                            ORDER BY ar.processed_at DESC LIMIT 1
+                        ), 0) as already_rewarded
+                    FROM activity_messages am
+                    WHERE am.hour_bucket >= ? AND am.hour_bucket < ?
+                """
+                start_bucket = _epoch_hour(start_time)
+                end_bucket = _epoch_hour(end_time)
+                params = [day_bucket, start_bucket, end_bucket]
             
-            if guild_id:
-                query += " AND guild_id = ?"
-                params.append(guild_id)
+                if guild_id:
+                    query += " AND am.guild_id = ?"
+                    params.append(guild_id)
+                query += " GROUP BY am.user_id, am.guild_id"
             
-            cursor = await conn.execute(query, params)
-            activities = await cursor.fetchall()
+                cursor = await conn.execute(query, params)
+                activities = await cursor.fetchall()
             
-            guilds_processed = set()
+                guild_settings = {}
+                payouts = []
+                reward_rows = []
             
-            for user_id, guild_id, total_messages in activities:
-                # Check if already rewarded for this day
-                existing_reward = await conn.execute("""
-                    SELECT messages_counted FROM activity_rewards 
-                    WHERE user_id = ? AND guild_id = ? AND hour_bucket = ?
-                    ORDER BY processed_at DESC LIMIT 1
-                """, (user_id, guild_id, day_bucket))
-                
-                reward_row = await existing_reward.fetchone()
-                already_rewarded_messages = reward_row[0] if reward_row else 0
+                for user_id, guild_id, total_messages, already_rewarded_messages in activities:
+                    # Only process if there are new messages to reward
+                    new_messages = total_messages - already_rewarded_messages
+                    if new_messages <= 0:
+                        continue
                 
-                # Only process if there are new messages to reward
-                new_messages = total_messages - already_rewarded_messages
-                if new_messages <= 0:
-                    continue
+                    # Get settings for this guild (once per guild per run)
+                    settings = guild_settings.get(guild_id)
+                    if settings is None:
+                        settings = guild_settings[guild_id] = await self.get_activity_settings(guild_id)
+                    if not settings.get('enabled', True):
+                        continue
                 
-                # Get settings for this guild
-                settings = await self.get_activity_settings(guild_id)
-                if not settings.get('enabled', True):
-                    continue
+                    # Calculate points for new messages only
+                    points_per_message = settings.get('points_per_message', 2)
+                    bonus_multiplier = settings.get('bonus_multiplier', 1.0)
                 
-                # Calculate points for new messages only
-                points_per_message = settings.get('points_per_message', 2)
-                bonus_multiplier = settings.get('bonus_multiplier', 1.0)
+                    # Apply daily cap (max messages per day = max_per_hour * 16 active hours)
+                    max_daily_messages = settings.get('max_messages_per_hour', 50) * 16
+                    capped_messages = min(new_messages, max_daily_messages)
                 
-                # Apply daily cap (max messages per day = max_per_hour * 16 active hours)
-                max_daily_messages = settings.get('max_messages_per_hour', 50) * 16
-                capped_messages = min(new_messages, max_daily_messages)
+                    points_earned = int(capped_messages * points_per_message * bonus_multiplier)
                 
-                points_earned = int(capped_messages * points_per_message * bonus_multiplier)
+                    if points_earned > 0:
+                        # Queue the award and its reward record (using day bucket instead of hour bucket)
+                        payouts.append((user_id, points_earned, 'activity_reward', None,
+                                        f"Daily activity reward for {capped_messages} messages"))
+                        reward_rows.append((user_id, guild_id, points_earned, total_messages, day_bucket,
+                                            bonus_multiplier, now_str, now_str))
                 
-                if points_earned > 0:
-                    # Award points to user
-                    await user_manager.add_points(user_id, points_earned, 
-                                                'activity_reward',
-                                                description=f"Daily activity reward for {capped_messages} messages")
-                    
-                    # Record the reward (using day bucket instead of hour bucket)
-                    await conn.execute("""
-                        INSERT INTO activity_rewards (user_id, guild_id, points_earned, messages_counted, hour_bucket, bonus_multiplier, processed_at, created_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (user_id, guild_id, points_earned, total_messages, day_bucket, bonus_multiplier, now.isoformat(), now.isoformat()))
-                    
-                    results['users_processed'] += 1
-                    results['total_points_awarded'] += points_earned
-                    guilds_processed.add(guild_id)
+                # All balances, audit rows and reward records land in one commit
+                await self.users.add_points_many(payouts)
+                await conn.executemany(_SQL_INSERT_ACTIVITY_REWARD, reward_rows)
+                await conn.executemany(_SQL_UPSERT_ACTIVITY_DAILY, [
+                    (user_id, guild_id, bucket // 24, points, messages)
+                    for user_id, guild_id, points, messages, bucket, *_ in reward_rows
+                ])
             
-            results['guilds_processed'] = len(guilds_processed)
-            await conn.commit()
+            if reward_rows:
+                self._stats_cache.clear()
+            results['users_processed'] = len(payouts)
+            results['total_points_awarded'] = sum(row[2] for row in reward_rows)
+            results['guilds_processed'] = len({row[1] for row in reward_rows})
             
         except Exception as e:
             logger.error(f"Error processing daily activity rewards: {e}")
-            await conn.rollback()
         
         return results
 
     async def process_hourly_rewards(self, guild_id: int = None) -> Dict[str, int]:
         """Process activity rewards for current/recent activity (testing mode)"""
         now = datetime.now(timezone.utc)
+        now_str = now.isoformat()
         # For testing: process current hour AND previous hour to catch all recent activity
         current_hour = now.replace(minute=0, second=0, microsecond=0)
         previous_hour = current_hour - timedelta(hours=1)
         
-        current_bucket = current_hour.strftime('%Y-%m-%d-%H')
-        previous_bucket = previous_hour.strftime('%Y-%m-%d-%H')
+        current_bucket = _epoch_hour(current_hour)
+        previous_bucket = _epoch_hour(previous_hour)
         
-        conn = await self.db.get_connection()
         results = {'users_processed': 0, 'total_points_awarded': 0, 'guilds_processed': 0}
         
         try:
-            # Get all activity for both current and previous hour (testing mode)
-            query = """
-                SELECT user_id, guild_id, message_count, hour_bucket
-                FROM activity_messages 
-                WHERE hour_bucket IN (?, ?)
-            """
-            params = [current_bucket, previous_bucket]
+            async with self.db.transaction() as conn:
+                # Get all activity for both current and previous hour (testing mode),
+                # alongside the message count already rewarded for each hour
+                query = """
+                    SELECT am.user_id, am.guild_id, am.message_count, am.hour_bucket,
+                        COALESCE((
+                            SELECT ar.messages_counted FROM activity_rewards ar
+                            WHERE ar.user_id = am.user_id AND ar.guild_id = am.guild_id AND ar.hour_bucket = am.hour_bucket
+                            ORDER BY ar.processed_at DESC LIMIT 1
+                        ), 0) as already_rewarded
+                    FROM activity_messages am
+                    WHERE am.hour_bucket IN (?, ?)
+                """
+                params = [current_bucket, previous_bucket]
             
-            if guild_id:
-                query += " AND guild_id = ?"
-                params.append(guild_id)
+                if guild_id:
+                    query += " AND am.guild_id = ?"
+                    params.append(guild_id)
             
-            cursor = await conn.execute(query, params)
-            activities = await cursor.fetchall()
+                cursor = await conn.execute(query, params)
+                activities = await cursor.fetchall()
             
-            guilds_processed = set()
-            processed_buckets = set()
+                guild_settings = {}
+                payouts = []
+                reward_rows = []
             
-            for user_id, guild_id, message_count, hour_bucket in activities:
-                # Skip if we already processed this user for this hour in this batch
-                processing_key = f"{user_id}_{guild_id}_{hour_bucket}"
-                if processing_key in processed_buckets:
-                    continue
-                processed_buckets.add(processing_key)
+                # UNIQUE(user_id, guild_id, hour_bucket) guarantees one row per user per hour
+                for user_id, guild_id, message_count, hour_bucket, already_rewarded_messages in activities:
+                    # Only process if there are new messages to reward
+                    new_messages = message_count - already_rewarded_messages
+                    if new_messages <= 0:
+                        continue
                 
-                # Check if already rewarded for this hour and how many messages were rewarded
-                existing_reward = await conn.execute("""
-                    SELECT messages_counted FROM activity_rewards 
-                    WHERE user_id = ? AND guild_id = ? AND hour_bucket = ?
-                    ORDER BY processed_at DESC LIMIT 1
-                """, (user_id, guild_id, hour_bucket))
+                    # Get settings for this guild (once per guild per run)
+                    settings = guild_settings.get(guild_id)
+                    if settings is None:
+                        settings = guild_settings[guild_id] = await self.get_activity_settings(guild_id)
+                    if not settings.get('enabled', True):
+                        continue
                 
-                reward_row = await existing_reward.fetchone()
-                already_rewarded_messages = reward_row[0] if reward_row else 0
+                    # Calculate points for new messages only
+                    points_per_message = settings.get('points_per_message', 2)
+                    bonus_multiplier = settings.get('bonus_multiplier', 1.0)
+                    points_earned = int(new_messages * points_per_message * bonus_multiplier)
                 
-                # Only process if there are new messages to reward
-                new_messages = message_count - already_rewarded_messages
-                if new_messages <= 0:
-                    continue
+                    if points_earned > 0:
+                        # Queue the award and its reward record
+                        payouts.append((user_id, points_earned, 'activity_reward', None,
+                                        f"Activity reward for {new_messages} new messages ({message_count} total)"))
+                        reward_rows.append((user_id, guild_id, points_earned, message_count, hour_bucket,
+                                            bonus_multiplier, now_str, now_str))
                 
-                # Get settings for this guild
-                settings = await self.get_activity_settings(guild_id)
-                if not settings.get('enabled', True):
-                    continue
-                
-                # Calculate points for new messages only
-                points_per_message = settings.get('points_per_message', 2)
-                bonus_multiplier = settings.get('bonus_multiplier', 1.0)
-                points_earned = int(new_messages * points_per_message * bonus_multiplier)
-                
-                if points_earned > 0:
-                    # Award points to user
-                    await user_manager.add_points(user_id, points_earned, 
-                                                'activity_reward',
-                                                description=f"Activity reward for {new_messages} new messages ({message_count} total)")
-                    
-                    # Record the reward
-                    await conn.execute("""
-                        INSERT INTO activity_rewards (user_id, guild_id, points_earned, messages_counted, hour_bucket, bonus_multiplier, processed_at, created_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (user_id, guild_id, points_earned, message_count, hour_bucket, bonus_multiplier, now.isoformat(), now.isoformat()))
-                    
-                    results['users_processed'] += 1
-                    results['total_points_awarded'] += points_earned
-                    guilds_processed.add(guild_id)
+                # All balances, audit rows and reward records land in one commit
+                await self.users.add_points_many(payouts)
+                await conn.executemany(_SQL_INSERT_ACTIVITY_REWARD, reward_rows)
+                await conn.executemany(_SQL_UPSERT_ACTIVITY_DAILY, [
+                    (user_id, guild_id, bucket // 24, points, messages)
+                    for user_id, guild_id, points, messages, bucket, *_ in reward_rows
+                ])
             
-            results['guilds_processed'] = len(guilds_processed)
-            await conn.commit()
+            if reward_rows:
+                self._stats_cache.clear()
+            results['users_processed'] = len(payouts)
+            results['total_points_awarded'] = sum(row[2] for row in reward_rows)
+            results['guilds_processed'] = len({row[1] for row in reward_rows})
             
         except Exception as e:
             logger.error(f"Error processing activity rewards: {e}")
-            await conn.rollback()
         
         return results
     
     async def get_activity_settings(self, guild_id: int) -> Dict[str, Any]:
-        """Get activity settings for a guild"""
+        """Get activity settings for a guild, served from a short-lived cache"""
+        cached_at = self._settings_cache_ts.get(guild_id)
+        if cached_at is not None and monotonic() - cached_at < _SETTINGS_CACHE_TTL:
+            # The excluded id sets are frozen, so a shallow copy is enough
+            return dict(self._settings_cache[guild_id])
+        
+        settings = await self._load_activity_settings(guild_id)
+        self._settings_cache[guild_id] = settings
+        self._settings_cache_ts[guild_id] = monotonic()
+        return dict(settings)
+    
+    async def _load_activity_settings(self, guild_id: int) -> Dict[str, Any]:
+        """Read a guild's activity settings row, falling back to the defaults"""
         conn = await self.db.get_connection()
         
-        cursor = await conn.execute(
-            "SELECT * FROM activity_settings WHERE guild_id = ?", (guild_id,)
-        )
+        cursor = await conn.execute(_SQL_SELECT_ACTIVITY_SETTINGS, (guild_id,))
         row = await cursor.fetchone()
         
         if row:
@@ -630,8 +1063,8 @@ class ActivityManager:
                 'max_messages_per_hour': row[4],
                 'min_message_length': row[5],
                 'bonus_multiplier': row[6],
-                'excluded_channels': json.loads(row[7]),
-                'excluded_roles': json.loads(row[8])
+                'excluded_channels': _load_id_set(row[7]),
+                'excluded_roles': _load_id_set(row[8])
             }
         else:
             # Return default settings
@@ -643,117 +1076,145 @@ class ActivityManager:
                 'max_messages_per_hour': 50,
                 'min_message_length': 3,
                 'bonus_multiplier': 1.0,
-                'excluded_channels': [],
-                'excluded_roles': []
+                'excluded_channels': _NO_IDS,
+                'excluded_roles': _NO_IDS
             }
     
     async def update_activity_settings(self, guild_id: int, settings: Dict[str, Any]) -> bool:
         """Update activity settings for a guild"""
         now = datetime.now(timezone.utc).isoformat()
-        conn = await self.db.get_connection()
         
         try:
-            # Check if settings exist
-            cursor = await conn.execute("SELECT guild_id FROM activity_settings WHERE guild_id = ?", (guild_id,))
-            exists = await cursor.fetchone()
+            async with self.db.transaction() as conn:
+                # Check if settings exist
+                cursor = await conn.execute("SELECT guild_id FROM activity_settings WHERE guild_id = ?", (guild_id,))
+                exists = await cursor.fetchone()
             
-            excluded_channels = json.dumps(settings.get('excluded_channels', []))
-            excluded_roles = json.dumps(settings.get('excluded_roles', []))
+                excluded_channels = json.dumps(sorted(settings.get('excluded_channels', ())))
+                excluded_roles = json.dumps(sorted(settings.get('excluded_roles', ())))
             
-            if exists:
-                await conn.execute("""
-                    UPDATE activity_settings 
-                    SET enabled = ?, points_per_message = ?, message_cooldown = ?, 
-                        max_messages_per_hour = ?, min_message_length = ?, bonus_multiplier = ?,
-                        excluded_channels = ?, excluded_roles = ?, updated_at = ?
-                    WHERE guild_id = ?
-                """, (
-                    settings.get('enabled', True),
-                    settings.get('points_per_message', 2),
-                    settings.get('message_cooldown', 600),
-                    settings.get('max_messages_per_hour', 50),
-                    settings.get('min_message_length', 3),
-                    settings.get('bonus_multiplier', 1.0),
-                    excluded_channels,
-                    excluded_roles,
-                    now,
-                    guild_id
-                ))
-            else:
-                await conn.execute("""
-                    INSERT INTO activity_settings 
-                    (guild_id, enabled, points_per_message, message_cooldown, max_messages_per_hour, 
-                     min_message_length, bonus_multiplier, excluded_channels, excluded_roles, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    guild_id,
-                    settings.get('enabled', True),
-                    settings.get('points_per_message', 2),
-                    settings.get('message_cooldown', 600),
-                    settings.get('max_messages_per_hour', 50),
-                    settings.get('min_message_length', 3),
-                    settings.get('bonus_multiplier', 1.0),
-                    excluded_channels,
-                    excluded_roles,
-                    now,
-                    now
-                ))
+                if exists:
+                    await conn.execute("""
+                        UPDATE activity_settings 
+                        SET enabled = ?, points_per_message = ?, message_cooldown = ?, 
+                            max_messages_per_hour = ?, min_message_length = ?, bonus_multiplier = ?,
+                            excluded_channels = ?, excluded_roles = ?, updated_at = ?
+                        WHERE guild_id = ?
+                    """, (
+                        settings.get('enabled', True),
+                        settings.get('points_per_message', 2),
+                        settings.get('message_cooldown', 600),
+                        settings.get('max_messages_per_hour', 50),
+                        settings.get('min_message_length', 3),
+                        settings.get('bonus_multiplier', 1.0),
+                        excluded_channels,
+                        excluded_roles,
+                        now,
+                        guild_id
+                    ))
+                else:
+                    await conn.execute("""
+                        INSERT INTO activity_settings 
+                        (guild_id, enabled, points_per_message, message_cooldown, max_messages_per_hour, 
+                         min_message_length, bonus_multiplier, excluded_channels, excluded_roles, created_at, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        guild_id,
+                        settings.get('enabled', True),
+                        settings.get('points_per_message', 2),
+                        settings.get('message_cooldown', 600),
+                        settings.get('max_messages_per_hour', 50),
+                        settings.get('min_message_length', 3),
+                        settings.get('bonus_multiplier', 1.0),
+                        excluded_channels,
+                        excluded_roles,
+                        now,
+                        now
+                    ))
             
-            await conn.commit()
+            self._settings_cache.pop(guild_id, None)
+            self._settings_cache_ts.pop(guild_id, None)
             return True
             
         except Exception as e:
             logger.error(f"Error updating activity settings: {e}")
-            await conn.rollback()
             return False
     
     async def get_user_activity_stats(self, user_id: int, guild_id: int = None, days: int = 7) -> Dict[str, Any]:
-        """Get activity statistics for a user"""
+        """Get activity statistics for a user, cached until the day rolls over or rewards are paid"""
+        start_day, end_day = _epoch_day_range(days)
+        key = (user_id, guild_id, days)
+        entry = self._stats_cache.get(key)
+        if entry is not None and entry[0] == end_day:
+            self._stats_cache.move_to_end(key)
+            return dict(entry[1])
+        
+        try:
+            stats = await self._load_user_activity_stats(user_id, guild_id, start_day, end_day, days)
+        except Exception as e:
+            logger.error(f"Error getting user activity stats: {e}")
+            return self._activity_stats(0, 0, 0, days)
+        
+        self._stats_cache[key] = (end_day, stats)
+        self._stats_cache.move_to_end(key)
+        if len(self._stats_cache) > _ACTIVITY_STATS_CACHE_SIZE:
+            self._stats_cache.popitem(last=False)
+        return dict(stats)
+    
+    async def _load_user_activity_stats(self, user_id: int, guild_id: Optional[int],
+                                        start_day: int, end_day: int, days: int) -> Dict[str, Any]:
+        """Sum a user's activity rewards between two epoch days from the daily rollup"""
+        conn = await self.db.get_connection()
+        guild_id = guild_id or None
+        cursor = await conn.execute(
+            _SQL_USER_ACTIVITY_STATS, (user_id, start_day, end_day, guild_id, guild_id)
+        )
+        reward_count, total_points, total_messages = await cursor.fetchone()
+        return self._activity_stats(reward_count, total_points, total_messages, days)
+    
+    async def get_users_activity_stats(self, user_ids: List[int], guild_id: int = None,
+                                       days: int = 7) -> Dict[int, Dict[str, Any]]:
+        """Get activity statistics for many users with one query per chunk of ids"""
+        user_ids = list(dict.fromkeys(user_ids))
         conn = await self.db.get_connection()
         
-        # Calculate date range
-        end_date = datetime.now(timezone.utc)
-        start_date = end_date - timedelta(days=days)
-        start_bucket = start_date.strftime('%Y-%m-%d-%H')
-        end_bucket = end_date.strftime('%Y-%m-%d-%H')
+        start_day, end_day = _epoch_day_range(days)
+        guild_id = guild_id or None
         
+        totals = {}
         try:
-            # Get activity rewards for the period
-            query = """
-                SELECT COUNT(*) as reward_count, SUM(points_earned) as total_points, SUM(messages_counted) as total_messages
-                FROM activity_rewards 
-                WHERE user_id = ? AND hour_bucket >= ? AND hour_bucket <= ?
-            """
-            params = [user_id, start_bucket, end_bucket]
-            
-            if guild_id:
-                query += " AND guild_id = ?"
-                params.append(guild_id)
-            
-            cursor = await conn.execute(query, params)
-            row = await cursor.fetchone()
-            
-            reward_count, total_points, total_messages = row if row else (0, 0, 0)
-            
-            return {
-                'reward_periods': reward_count or 0,
-                'total_points_earned': total_points or 0,
-                'total_messages': total_messages or 0,
-                'days_tracked': days,
-                'average_points_per_day': round((total_points or 0) / days, 1),
-                'average_messages_per_day': round((total_messages or 0) / days, 1)
-            }
-            
+            for i in range(0, len(user_ids), _SQL_MAX_IDS_PER_QUERY):
+                chunk = user_ids[i:i + _SQL_MAX_IDS_PER_QUERY]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = await conn.execute(f"""
+                    SELECT user_id, SUM(reward_count), SUM(total_points), SUM(total_messages)
+                    FROM activity_rewards_daily
+                    WHERE user_id IN ({placeholders}) AND day BETWEEN ? AND ?
+                      AND (? IS NULL OR guild_id = ?)
+                    GROUP BY user_id
+                """, (*chunk, start_day, end_day, guild_id, guild_id))
+                for user_id, reward_count, total_points, total_messages in await cursor.fetchall():
+                    totals[user_id] = (reward_count, total_points, total_messages)
         except Exception as e:
-            logger.error(f"Error getting user activity stats: {e}")
-            return {
-                'reward_periods': 0,
-                'total_points_earned': 0, 
-                'total_messages': 0,
-                'days_tracked': days,
-                'average_points_per_day': 0.0,
-                'average_messages_per_day': 0.0
-            }
+            logger.error(f"Error getting activity stats for {len(user_ids)} users: {e}")
+            totals = {}
+        
+        return {
+            user_id: self._activity_stats(*totals.get(user_id, (0, 0, 0)), days)
+            for user_id in user_ids
+        }
+    
+    @staticmethod
+    def _activity_stats(reward_count: int, total_points: int, total_messages: int, days: int) -> Dict[str, Any]:
+        """Shape summed rollup totals into the activity stats dict"""
+        return {
+            'reward_periods': reward_count,
+            'total_points_earned': total_points,
+            'total_messages': total_messages,
+            'days_tracked': days,
+            'average_points_per_day': round(total_points / days, 1),
+            'average_messages_per_day': round(total_messages / days, 1)
+        }
 
 # Create global activity manager instance
 activity_manager = None
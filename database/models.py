@@ -1,6 +1,7 @@
 import aiosqlite
 import json
 from datetime import datetime, timezone
+from operator import itemgetter
 from typing import Optional, Dict, Any, List
 import logging
 
@@ -9,9 +10,54 @@ logger = logging.getLogger(__name__)
 class DatabaseModels:
     """Database schema and table creation"""
     
+    # 'YYYY-MM-DD-HH' or 'YYYY-MM-DD' text bucket -> hours since the Unix epoch
+    _TEXT_BUCKET_TO_EPOCH_HOUR = (
+        "CAST(strftime('%s', substr(hour_bucket, 1, 10)) AS INTEGER) / 3600"
+        " + COALESCE(CAST(NULLIF(substr(hour_bucket, 12, 2), '') AS INTEGER), 0)"
+    )
+    
+    @staticmethod
+    async def _column_names(db: aiosqlite.Connection, table: str) -> List[str]:
+        """Column names of a table, in declaration order"""
+        cursor = await db.execute(f"PRAGMA table_info({table})")
+        return [row[1] for row in await cursor.fetchall()]
+    
+    @staticmethod
+    async def _column_type(db: aiosqlite.Connection, table: str, column: str) -> Optional[str]:
+        """Declared type of a column, or None if the table or column doesn't exist"""
+        cursor = await db.execute(f"PRAGMA table_info({table})")
+        for row in await cursor.fetchall():
+            if row[1] == column:
+                return row[2].upper()
+        return None
+    
+    @staticmethod
+    async def _is_rowid_table(db: aiosqlite.Connection, table: str) -> bool:
+        """Whether an existing table was created with a rowid (i.e. without WITHOUT ROWID)"""
+        cursor = await db.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        row = await cursor.fetchone()
+        return row is not None and 'WITHOUT ROWID' not in row[0].upper()
+    
     @staticmethod
     async def create_tables(db: aiosqlite.Connection):
         """Create all necessary tables for the betting bot"""
+        # sqlite3 runs DDL in autocommit mode, so without an explicit transaction
+        # every CREATE/DROP/ALTER below would be its own WAL commit
+        await db.execute("BEGIN IMMEDIATE")
+        try:
+            await DatabaseModels._create_schema(db)
+        except BaseException:
+            await db.rollback()
+            raise
+        await db.commit()
+        
+        # Refresh planner statistics so the new indexes are picked up
+        await db.execute("ANALYZE")
+        logger.info("Database tables created successfully")
+    
+    @staticmethod
+    async def _create_schema(db: aiosqlite.Connection):
+        """Create or migrate every table and index; runs inside create_tables' transaction"""
         
         # Users table
         await db.execute("""
@@ -25,14 +71,36 @@ class DatabaseModels:
                 total_amount_lost INTEGER DEFAULT 0,
                 last_daily_claim TEXT NULL,
                 last_bailout_claim TEXT NULL,
-                is_registered BOOLEAN DEFAULT TRUE,
                 registration_date TEXT NOT NULL,
                 last_activity TEXT NOT NULL,
                 created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
+                updated_at TEXT NOT NULL,
+                win_rate REAL GENERATED ALWAYS AS (
+                    ROUND(100.0 * total_bets_won / MAX(1, total_bets_placed), 1)
+                ) VIRTUAL,
+                net_profit INTEGER GENERATED ALWAYS AS (total_amount_won - total_amount_lost) VIRTUAL
             )
         """)
         
+        # Databases created before the generated stats columns existed get them added
+        # (SQLite only allows adding VIRTUAL generated columns with ALTER TABLE)
+        cursor = await db.execute("PRAGMA table_xinfo(users)")
+        user_columns = {row[1] for row in await cursor.fetchall()}
+        if 'win_rate' not in user_columns:
+            await db.execute("""
+                ALTER TABLE users ADD COLUMN win_rate REAL GENERATED ALWAYS AS (
+                    ROUND(100.0 * total_bets_won / MAX(1, total_bets_placed), 1)
+                ) VIRTUAL
+            """)
+        if 'net_profit' not in user_columns:
+            await db.execute(
+                "ALTER TABLE users ADD COLUMN net_profit INTEGER "
+                "GENERATED ALWAYS AS (total_amount_won - total_amount_lost) VIRTUAL"
+            )
+        # is_registered was never set to anything but TRUE
+        if 'is_registered' in user_columns:
+            await db.execute("ALTER TABLE users DROP COLUMN is_registered")
+        
         # Bets table
         await db.execute("""
             CREATE TABLE IF NOT EXISTS bets (
@@ -104,11 +172,24 @@ class DatabaseModels:
                 default_lock_time INTEGER DEFAULT 3600,
                 bet_history_channel INTEGER NULL,
                 active_bets_channel INTEGER NULL,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
+                created_at INTEGER NOT NULL,  -- Unix epoch seconds
+                updated_at INTEGER NOT NULL
             )
         """)
         
+        # hour_bucket used to be TEXT 'YYYY-MM-DD-HH' (or 'YYYY-MM-DD' for daily
+        # rewards). SQLite can't change a column's type in place, so old tables
+        # are set aside here and copied into the INTEGER layout created below
+        legacy_bucket_tables = []
+        for table in ('activity_messages', 'activity_rewards'):
+            if await DatabaseModels._column_type(db, table, 'hour_bucket') == 'TEXT':
+                await db.execute(f"ALTER TABLE {table} RENAME TO {table}_text_buckets")
+                legacy_bucket_tables.append(table)
+        if (await DatabaseModels._column_type(db, 'activity_rewards_daily', 'day') == 'TEXT'
+                or await DatabaseModels._is_rowid_table(db, 'activity_rewards_daily')):
+            # Derived data: dropped here and rebuilt by the backfill below
+            await db.execute("DROP TABLE activity_rewards_daily")
+        
         # Activity tracking tables
         await db.execute("""
             CREATE TABLE IF NOT EXISTS activity_messages (
@@ -118,7 +199,7 @@ class DatabaseModels:
                 channel_id INTEGER NOT NULL,
                 message_count INTEGER DEFAULT 1,
                 last_message_time TEXT NOT NULL,
-                hour_bucket TEXT NOT NULL,  -- Format: YYYY-MM-DD-HH for grouping
+                hour_bucket INTEGER NOT NULL,  -- Hours since the Unix epoch (UTC) for grouping
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL,
                 UNIQUE(user_id, guild_id, hour_bucket)
@@ -132,13 +213,49 @@ class DatabaseModels:
                 guild_id INTEGER NOT NULL,
                 points_earned INTEGER NOT NULL,
                 messages_counted INTEGER NOT NULL,
-                hour_bucket TEXT NOT NULL,
+                hour_bucket INTEGER NOT NULL,  -- Epoch hour; daily rewards use the day's first hour
                 bonus_multiplier REAL DEFAULT 1.0,
                 processed_at TEXT NOT NULL,
                 created_at TEXT NOT NULL
             )
         """)
         
+        for table in legacy_bucket_tables:
+            columns = await DatabaseModels._column_names(db, f"{table}_text_buckets")
+            selected = ", ".join(
+                DatabaseModels._TEXT_BUCKET_TO_EPOCH_HOUR if column == 'hour_bucket' else column
+                for column in columns
+            )
+            await db.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) SELECT {selected} FROM {table}_text_buckets"
+            )
+            await db.execute(f"DROP TABLE {table}_text_buckets")
+            logger.info(f"Migrated {table}.hour_bucket to epoch hours")
+        
+        # Per-day rollup of activity_rewards, maintained on the reward write path.
+        # Stored clustered on its composite key: a rowid table would also need a
+        # separate autoindex for the PRIMARY KEY that every UPSERT has to update
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS activity_rewards_daily (
+                user_id INTEGER NOT NULL,
+                guild_id INTEGER NOT NULL,
+                day INTEGER NOT NULL,  -- Days since the Unix epoch (UTC)
+                reward_count INTEGER NOT NULL DEFAULT 0,
+                total_points INTEGER NOT NULL DEFAULT 0,
+                total_messages INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, guild_id, day)
+            ) WITHOUT ROWID
+        """)
+        
+        # Databases with reward history from before the rollup existed get it backfilled once
+        await db.execute("""
+            INSERT INTO activity_rewards_daily (user_id, guild_id, day, reward_count, total_points, total_messages)
+            SELECT user_id, guild_id, hour_bucket / 24, COUNT(*), SUM(points_earned), SUM(messages_counted)
+            FROM activity_rewards
+            WHERE NOT EXISTS (SELECT 1 FROM activity_rewards_daily)
+            GROUP BY user_id, guild_id, hour_bucket / 24
+        """)
+        
         await db.execute("""
             CREATE TABLE IF NOT EXISTS activity_settings (
                 guild_id INTEGER PRIMARY KEY,
@@ -158,62 +275,120 @@ class DatabaseModels:
         # Create indexes
         await db.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_bets_creator ON bets(creator_id)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_bets_status ON bets(status)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_user_bets_user ON user_bets(user_id)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_user_bets_bet ON user_bets(bet_id)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_transactions_user ON transactions(user_id)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions(transaction_type)")
         
-        # Activity indexes for performance
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_activity_messages_user_guild ON activity_messages(user_id, guild_id)")
+        # Only open bets are ever listed by status; a partial index keeps resolved
+        # and cancelled bets out of the B-tree and serves the ORDER BY created_at
+        await db.execute("DROP INDEX IF EXISTS idx_bets_status")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_bets_open ON bets(created_at) WHERE status = 'open'")
+        
+        # Covering indexes for the stats aggregates and the leaderboard; these
+        # supersede the single-column user_id indexes on user_bets/transactions
+        await db.execute("DROP INDEX IF EXISTS idx_user_bets_user")
+        await db.execute("DROP INDEX IF EXISTS idx_transactions_user")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_userbets_user_status ON user_bets(user_id, status)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_txn_user_type_amt ON transactions(user_id, transaction_type, amount)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_users_balance_desc ON users(balance DESC)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_users_net_profit_desc ON users(net_profit DESC)")
+        
+        # Activity indexes for performance. activity_messages lookups by
+        # (user_id, guild_id, hour_bucket) are served by its UNIQUE constraint and
+        # activity_settings by its primary key, so those need no extra index
+        await db.execute("DROP INDEX IF EXISTS idx_activity_messages_user_guild")
+        await db.execute("DROP INDEX IF EXISTS idx_activity_rewards_user_guild")
+        await db.execute("DROP INDEX IF EXISTS idx_activity_settings_guild")
+        await db.execute("DROP INDEX IF EXISTS idx_activity_rewards_user_guild_hour")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_activity_messages_hour ON activity_messages(hour_bucket)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_activity_rewards_user_guild ON activity_rewards(user_id, guild_id)")
+        # Covers the latest-reward probe (ORDER BY processed_at DESC LIMIT 1): no sort, no table lookup
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_activity_rewards_lookup ON activity_rewards(user_id, guild_id, hour_bucket, processed_at, messages_counted)")
         await db.execute("CREATE INDEX IF NOT EXISTS idx_activity_rewards_hour ON activity_rewards(hour_bucket)")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_activity_settings_guild ON activity_settings(guild_id)")
-
-        await db.commit()
-        logger.info("Database tables created successfully")
+        # Covers the all-guilds stats range read; the primary key serves the per-guild one
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_activity_rewards_daily_user_day ON activity_rewards_daily(user_id, day, reward_count, total_points, total_messages)")
+        
+        # bets.total_pool is the sum of its user_bets amounts, kept in step by SQLite
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_user_bets_pool_insert AFTER INSERT ON user_bets
+            BEGIN
+                UPDATE bets SET total_pool = total_pool + NEW.amount WHERE bet_id = NEW.bet_id;
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_user_bets_pool_update AFTER UPDATE OF amount, bet_id ON user_bets
+            BEGIN
+                UPDATE bets SET total_pool = total_pool - OLD.amount WHERE bet_id = OLD.bet_id;
+                UPDATE bets SET total_pool = total_pool + NEW.amount WHERE bet_id = NEW.bet_id;
+            END
+        """)
+        await db.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_user_bets_pool_delete AFTER DELETE ON user_bets
+            BEGIN
+                UPDATE bets SET total_pool = total_pool - OLD.amount WHERE bet_id = OLD.bet_id;
+            END
+        """)
 
 class User:
     """User model for database operations"""
     
-    def __init__(self, discord_id: int, username: str, balance: int = 1000, **kwargs):
+    # One slot per users column; rows are read by column name, not position
+    __slots__ = (
+        'discord_id', 'username', 'balance', 'total_bets_placed', 'total_bets_won',
+        'total_amount_won', 'total_amount_lost', 'last_daily_claim', 'last_bailout_claim',
+        'registration_date', 'last_activity', 'created_at', 'updated_at', 'win_rate', 'net_profit'
+    )
+    
+    # Pulls every column out of a Row by name in one C-level call
+    _row_values = itemgetter(*__slots__)
+    
+    def __init__(self, discord_id: int, username: str, balance: int = 1000,
+                 total_bets_placed: int = 0, total_bets_won: int = 0,
+                 total_amount_won: int = 0, total_amount_lost: int = 0,
+                 last_daily_claim: Optional[str] = None, last_bailout_claim: Optional[str] = None,
+                 registration_date: Optional[str] = None, last_activity: Optional[str] = None,
+                 created_at: Optional[str] = None, updated_at: Optional[str] = None,
+                 win_rate: Optional[float] = None, net_profit: Optional[int] = None):
         self.discord_id = discord_id
         self.username = username
         self.balance = balance
-        self.total_bets_placed = kwargs.get('total_bets_placed', 0)
-        self.total_bets_won = kwargs.get('total_bets_won', 0)
-        self.total_amount_won = kwargs.get('total_amount_won', 0)
-        self.total_amount_lost = kwargs.get('total_amount_lost', 0)
-        self.last_daily_claim = kwargs.get('last_daily_claim')
-        self.last_bailout_claim = kwargs.get('last_bailout_claim')
-        self.is_registered = kwargs.get('is_registered', True)
-        self.registration_date = kwargs.get('registration_date')
-        self.last_activity = kwargs.get('last_activity')
-        self.created_at = kwargs.get('created_at')
-        self.updated_at = kwargs.get('updated_at')
+        self.total_bets_placed = total_bets_placed
+        self.total_bets_won = total_bets_won
+        self.total_amount_won = total_amount_won
+        self.total_amount_lost = total_amount_lost
+        self.last_daily_claim = last_daily_claim
+        self.last_bailout_claim = last_bailout_claim
+        self.registration_date = registration_date
+        self.last_activity = last_activity
+        self.created_at = created_at
+        self.updated_at = updated_at
+        
+        # Read from the generated columns; computed here only for rows built outside the database
+        if win_rate is None:
+            win_rate = round((total_bets_won / max(1, total_bets_placed)) * 100, 1)
+        self.win_rate = float(win_rate)  # RETURNING can hand back whole REAL values as int
+        if net_profit is None:
+            net_profit = total_amount_won - total_amount_lost
+        self.net_profit = net_profit
     
     @classmethod
     def from_db_row(cls, row):
-        """Create User instance from database row"""
+        """Create User instance from a users row (SELECT * / RETURNING * as a Row)"""
         if not row:
             return None
-        return cls(
-            discord_id=row[0],
-            username=row[1],
-            balance=row[2],
-            total_bets_placed=row[3],
-            total_bets_won=row[4],
-            total_amount_won=row[5],
-            total_amount_lost=row[6],
-            last_daily_claim=row[7],
-            last_bailout_claim=row[8],
-            is_registered=row[9],
-            registration_date=row[10],
-            last_activity=row[11],
-            created_at=row[12],
-            updated_at=row[13]
-        )
+        
+        # Database rows carry every column, so __init__'s defaults and fallbacks are skipped
+        user = cls.__new__(cls)
+        (user.discord_id, user.username, user.balance, user.total_bets_placed,
+         user.total_bets_won, user.total_amount_won, user.total_amount_lost,
+         user.last_daily_claim, user.last_bailout_claim, user.registration_date,
+         user.last_activity, user.created_at, user.updated_at, win_rate, user.net_profit) = cls._row_values(row)
+        user.win_rate = float(win_rate)  # RETURNING can hand back whole REAL values as int
+        return user
+    
+    @classmethod
+    def from_db_rows(cls, rows) -> List['User']:
+        """Create User instances for a batch of users rows"""
+        from_db_row = cls.from_db_row
+        return [from_db_row(row) for row in rows]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert user to dictionary"""
@@ -225,8 +400,8 @@ class User:
             'total_bets_won': self.total_bets_won,
             'total_amount_won': self.total_amount_won,
             'total_amount_lost': self.total_amount_lost,
-            'win_rate': round((self.total_bets_won / max(1, self.total_bets_placed)) * 100, 1),
-            'net_profit': self.total_amount_won - self.total_amount_lost,
+            'win_rate': self.win_rate,
+            'net_profit': self.net_profit,
             'registration_date': self.registration_date,
             'last_activity': self.last_activity
         }